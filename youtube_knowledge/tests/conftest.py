@@ -1,17 +1,31 @@
-"""Shared fixtures for pytest tests."""
+"""Shared fixtures for pytest tests.
+
+Sample data fixtures are session-scoped and read-only; tests that need to
+modify one should take a ``copy.deepcopy`` first.
+"""
+
+from types import MappingProxyType, SimpleNamespace
+from unittest.mock import MagicMock
 
 import pytest
+import yt_dlp
+from google import genai
 
+from youtube_knowledge._client import get_client
 from youtube_knowledge.models import TranscriptEntry, VideoInfo
+from youtube_knowledge.playlist import PlaylistFetcher
+from youtube_knowledge.transcript import TranscriptRetriever
+from youtube_knowledge.transform import TranscriptTransformer
+from youtube_knowledge.uploader import GeminiUploader
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_video_id():
     """Sample YouTube video ID."""
     return "dQw4w9WgXcQ"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_video_info():
     """Sample VideoInfo object."""
     return VideoInfo(
@@ -21,64 +35,127 @@ def sample_video_info():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_transcript_data():
     """Sample raw transcript data from YouTube API."""
-    return [
-        {"text": "Hello world", "start": 0.0, "duration": 2.5},
-        {"text": "This is a test", "start": 2.5, "duration": 3.0},
-        {"text": "Sample transcript", "start": 5.5, "duration": 2.0},
-    ]
+    return (
+        MappingProxyType({"text": "Hello world", "start": 0.0, "duration": 2.5}),
+        MappingProxyType({"text": "This is a test", "start": 2.5, "duration": 3.0}),
+        MappingProxyType({"text": "Sample transcript", "start": 5.5, "duration": 2.0}),
+    )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_transcript_entries():
     """Sample TranscriptEntry objects."""
-    return [
+    return (
         TranscriptEntry(text="Hello world", start=0.0, duration=2.5),
         TranscriptEntry(text="This is a test", start=2.5, duration=3.0),
         TranscriptEntry(text="Sample transcript", start=5.5, duration=2.0),
-    ]
+    )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_playlist_id():
     """Sample YouTube playlist ID."""
     return "PLrAXtmErZgOeiKm4sgNOknGvNjby9efdf"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_playlist_data():
     """Sample playlist data from yt-dlp."""
-    return {
-        "title": "Sample Playlist",
-        "entries": [
-            {
-                "id": "video1",
-                "title": "First Video",
-                "webpage_url": "https://www.youtube.com/watch?v=video1",
-            },
-            {
-                "id": "video2",
-                "title": "Second Video",
-                "webpage_url": "https://www.youtube.com/watch?v=video2",
-            },
-            {
-                "id": "video3",
-                "title": "Third Video",
-                "webpage_url": "https://www.youtube.com/watch?v=video3",
-            },
-        ],
-    }
+    return MappingProxyType(
+        {
+            "title": "Sample Playlist",
+            "entries": [
+                {
+                    "id": "video1",
+                    "title": "First Video",
+                    "webpage_url": "https://www.youtube.com/watch?v=video1",
+                },
+                {
+                    "id": "video2",
+                    "title": "Second Video",
+                    "webpage_url": "https://www.youtube.com/watch?v=video2",
+                },
+                {
+                    "id": "video3",
+                    "title": "Third Video",
+                    "webpage_url": "https://www.youtube.com/watch?v=video3",
+                },
+            ],
+        }
+    )
+
+
+@pytest.fixture(scope="module")
+def module_fetcher():
+    """PlaylistFetcher shared by the tests in a module."""
+    return PlaylistFetcher()
 
 
 @pytest.fixture
+def fetcher(module_fetcher):
+    """The module's shared PlaylistFetcher, with its playlist cache cleared."""
+    module_fetcher.cache_clear()
+    return module_fetcher
+
+
+@pytest.fixture(scope="module")
+def retriever():
+    """TranscriptRetriever (default languages) shared by the tests in a module."""
+    return TranscriptRetriever()
+
+
+class FakeYDL:
+    """Minimal stand-in for yt_dlp.YoutubeDL with a real context-manager protocol."""
+
+    def __init__(self, info=None, exc=None):
+        self._info, self._exc = info, exc
+        self.opts: list[dict] = []
+        self.calls: list[tuple[str, bool]] = []
+
+    def __call__(self, opts):
+        self.opts.append(opts)
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def extract_info(self, url, download=False):
+        self.calls.append((url, download))
+        if self._exc:
+            raise self._exc
+        return self._info
+
+
+@pytest.fixture
+def fake_ydl(mocker):
+    """Factory that patches yt_dlp.YoutubeDL with a FakeYDL.
+
+    Call it with the ``info`` to return or the ``exc`` to raise from
+    ``extract_info``; it returns the FakeYDL, which records the options it was
+    constructed with and every ``extract_info`` call.
+    """
+
+    def _factory(info=None, exc=None):
+        fake = FakeYDL(info=info, exc=exc)
+        mocker.patch.object(yt_dlp, "YoutubeDL", fake)
+        return fake
+
+    return _factory
+
+
+@pytest.fixture(scope="session")
 def mock_gemini_api_key():
     """Mock Gemini API key."""
     return "mock-gemini-api-key-1234567890"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_transformed_content():
     """Sample transformed content from Gemini."""
     return """## Executive Summary
@@ -100,3 +177,81 @@ This video discusses sample topics with great detail.
 1. First key takeaway
 2. Second key takeaway
 """
+
+
+@pytest.fixture(autouse=True)
+def clear_client_cache():
+    """Drop cached Gemini clients so every test builds (or patches) its own."""
+    get_client.cache_clear()
+    yield
+    get_client.cache_clear()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def genai_client(session_mocker):
+    """Mock Gemini client patched over genai.Client once for the whole session.
+
+    Autouse so no test can reach the real API, even one that never asks for a
+    client fixture.
+    """
+    client = MagicMock()
+    session_mocker.patch.object(genai, "Client", return_value=client)
+    return client
+
+
+@pytest.fixture
+def mock_genai_client(genai_client):
+    """The session's mock Gemini client, reset so list endpoints return nothing.
+
+    Tests override only the return values they care about, e.g.
+    ``mock_genai_client.files.list.return_value = [file]``.
+    """
+    genai_client.reset_mock(return_value=True, side_effect=True)
+    genai_client.files.list.return_value = []
+    genai_client.file_search_stores.list.return_value = []
+    return genai_client
+
+
+@pytest.fixture(scope="module")
+def transformer(mock_gemini_api_key, genai_client):
+    """TranscriptTransformer (default model) shared by the tests in a module."""
+    return TranscriptTransformer(api_key=mock_gemini_api_key)
+
+
+@pytest.fixture(scope="module")
+def module_uploader(mock_gemini_api_key, genai_client):
+    """GeminiUploader shared by the tests in a module."""
+    return GeminiUploader(api_key=mock_gemini_api_key)
+
+
+@pytest.fixture
+def uploader(module_uploader):
+    """The module's shared GeminiUploader, with its file and store indexes cleared."""
+    module_uploader.refresh_file_index()
+    return module_uploader
+
+
+@pytest.fixture(scope="module")
+def sample_mock_response(sample_transformed_content):
+    """Stand-in generate_content response carrying the sample transformed content."""
+    return SimpleNamespace(text=sample_transformed_content)
+
+
+@pytest.fixture(scope="module")
+def sample_mock_operation():
+    """Stand-in upload operation that has finished indexing a document."""
+    return SimpleNamespace(
+        name="operations/upload-123",
+        done=True,
+        response=SimpleNamespace(document_name="fileSearchStores/store-123/documents/doc-456"),
+    )
+
+
+@pytest.fixture(scope="session")
+def make_file():
+    """Factory for lightweight stand-ins of Gemini File objects."""
+
+    def _factory(name, display_name):
+        return SimpleNamespace(name=name, display_name=display_name)
+
+    return _factory
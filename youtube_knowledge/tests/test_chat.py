@@ -0,0 +1,162 @@
+"""Tests for the knowledge base chat interface."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from youtube_knowledge.chat import KnowledgeBaseChat
+
+
+@pytest.fixture
+def chat(mock_genai_client, mock_gemini_api_key):
+    """KnowledgeBaseChat whose client streams "Answer" back for every question."""
+    mock_genai_client.models.generate_content_stream.return_value = [
+        SimpleNamespace(text="Ans", candidates=[]),
+        SimpleNamespace(text="wer", candidates=[]),
+    ]
+    return KnowledgeBaseChat(api_key=mock_gemini_api_key)
+
+
+class TestKnowledgeBaseChat:
+    """Tests for KnowledgeBaseChat class."""
+
+    def test_query_success(self, chat, mock_genai_client):
+        """Test querying the knowledge base with file search."""
+        result = chat.query("What is this?", "stores/test-123")
+
+        assert result == "Answer"
+        call_kwargs = mock_genai_client.models.generate_content_stream.call_args[1]
+        assert call_kwargs["contents"] == "What is this?"
+        file_search = call_kwargs["config"].tools[0].file_search
+        assert file_search.file_search_store_names == ["stores/test-123"]
+
+    def test_query_error_returns_none(self, chat, mock_genai_client):
+        """Test that API errors are reported by returning None."""
+        mock_genai_client.models.generate_content_stream.side_effect = Exception("API error")
+
+        assert chat.query("What is this?", "stores/test-123") is None
+
+    def test_query_caches_repeated_question(self, chat, mock_genai_client):
+        """Test that asking the same question twice only calls Gemini once."""
+        first = chat.query("What is this?", "stores/test-123")
+        second = chat.query("What is this?", "stores/test-123")
+
+        assert first == second == "Answer"
+        mock_genai_client.models.generate_content_stream.assert_called_once()
+
+    def test_query_cache_keyed_by_store(self, chat, mock_genai_client):
+        """Test that the same question against another store is not served from cache."""
+        chat.query("What is this?", "stores/test-123")
+        chat.query("What is this?", "stores/other-456")
+
+        assert mock_genai_client.models.generate_content_stream.call_count == 2
+
+    def test_query_no_cache(self, chat, mock_genai_client):
+        """Test that no_cache always asks Gemini."""
+        chat.query("What is this?", "stores/test-123")
+        chat.query("What is this?", "stores/test-123", no_cache=True)
+
+        assert mock_genai_client.models.generate_content_stream.call_count == 2
+
+    def test_query_cache_expires(self, chat, mock_genai_client):
+        """Test that cached answers older than the TTL are fetched again."""
+        chat.cache_ttl_seconds = 0
+
+        chat.query("What is this?", "stores/test-123")
+        chat.query("What is this?", "stores/test-123")
+
+        assert mock_genai_client.models.generate_content_stream.call_count == 2
+
+    def test_query_cache_evicts_least_recent(self, chat, mock_genai_client):
+        """Test that the cache holds at most cache_size answers."""
+        chat.cache_size = 1
+
+        chat.query("First?", "stores/test-123")
+        chat.query("Second?", "stores/test-123")
+        chat.query("First?", "stores/test-123")
+
+        assert mock_genai_client.models.generate_content_stream.call_count == 3
+
+    def test_cache_clear(self, chat, mock_genai_client):
+        """Test that clearing the cache forces a fresh answer."""
+        chat.query("What is this?", "stores/test-123")
+        chat.cache_clear()
+        chat.query("What is this?", "stores/test-123")
+
+        assert mock_genai_client.models.generate_content_stream.call_count == 2
+
+    def test_query_reuses_config(self, chat, mock_genai_client):
+        """Test that the request config is built once per store and reused."""
+        chat.query("First?", "stores/test-123")
+        chat.query("Second?", "stores/test-123")
+
+        assert len(chat._config_cache) == 1
+        first, second = mock_genai_client.models.generate_content_stream.call_args_list
+        assert first[1]["config"] is second[1]["config"]
+
+    def test_query_streams_chunks(self, mocker, chat, mock_genai_client):
+        """Test that streamed chunks are joined and sources come from the last chunk."""
+        last = SimpleNamespace(text=None, candidates=[SimpleNamespace()])
+        mock_genai_client.models.generate_content_stream.return_value = [
+            SimpleNamespace(text="Hello ", candidates=[]),
+            SimpleNamespace(text="world", candidates=[]),
+            last,
+        ]
+        display_sources = mocker.patch.object(chat, "_display_sources")
+
+        result = chat.query("What is this?", "stores/test-123")
+
+        assert result == "Hello world"
+        display_sources.assert_called_once_with(last)
+
+    def test_query_prints_raw_text_when_not_a_tty(self, mocker, capsys, chat):
+        """Test that piped output gets the plain answer instead of rendered Markdown."""
+        chat._is_tty = False
+        markdown = mocker.patch("rich.markdown.Markdown")
+
+        chat.query("What is this?", "stores/test-123")
+        chat.query("What is this?", "stores/test-123")
+
+        assert capsys.readouterr().out.count("Answer\n") == 2
+        markdown.assert_not_called()
+
+    def test_query_empty_stream_returns_none(self, chat, mock_genai_client):
+        """Test that a stream with no text is treated as no response."""
+        mock_genai_client.models.generate_content_stream.return_value = []
+
+        assert chat.query("What is this?", "stores/test-123") is None
+
+    def test_interactive_chat_warms_up_connection(self, mocker, chat, mock_genai_client):
+        """Test that the session opens a connection once and answers questions."""
+        mocker.patch("builtins.input", side_effect=["What is this?", "Why?", "exit"])
+
+        chat.interactive_chat("stores/test-123", playlist_title="Sample Playlist")
+
+        mock_genai_client.file_search_stores.get.assert_called_once_with(name="stores/test-123")
+        mock_genai_client.caches.create.assert_not_called()
+        assert mock_genai_client.models.generate_content_stream.call_count == 2
+
+    def test_display_sources(self, capsys, chat):
+        """Test that retrieval queries and the top three source titles are shown."""
+        grounding = SimpleNamespace(
+            retrieval_queries=["sample topic"],
+            grounding_chunks=[
+                SimpleNamespace(retrieved_context=SimpleNamespace(title=f"video{i}.md"))
+                for i in range(1, 5)
+            ],
+        )
+        response = SimpleNamespace(candidates=[SimpleNamespace(grounding_metadata=grounding)])
+
+        chat._display_sources(response)
+
+        output = capsys.readouterr().out
+        assert "• sample topic" in output
+        assert "1. video1.md" in output
+        assert "3. video3.md" in output
+        assert "video4.md" not in output
+
+    def test_display_sources_without_grounding(self, capsys, chat):
+        """Test that responses without grounding metadata print nothing."""
+        chat._display_sources(SimpleNamespace(candidates=[SimpleNamespace()]))
+
+        assert capsys.readouterr().out == ""
@@ -0,0 +1,191 @@
+"""Tests for the process command and its video processing pipeline."""
+
+import asyncio
+import hashlib
+from types import SimpleNamespace
+
+import pytest
+from click.testing import CliRunner
+
+from youtube_knowledge.cli import _VideoPipeline, get_api_key, process
+from youtube_knowledge.models import PlaylistState, ProcessedVideo, VideoInfo
+from youtube_knowledge.state import StateManager
+
+
+TRANSFORMED = "# Transformed"
+
+
+def _content_hash(content: str) -> str:
+    """Digest the pipeline records for uploaded content."""
+    return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+
+@pytest.fixture
+def outcomes():
+    """Status reported for each video ID the pipeline finishes with."""
+    return {}
+
+
+@pytest.fixture
+def pipeline(mocker, tmp_path, outcomes):
+    """_VideoPipeline with stub retriever, transformer and uploader, reporting to outcomes."""
+    retriever = mocker.Mock()
+    retriever.get_transcript_and_format.return_value = (["segment"], "[00:00] segment")
+    transformer = mocker.Mock()
+    transformer.atransform = mocker.AsyncMock(return_value=TRANSFORMED)
+    uploader = mocker.Mock()
+    uploader.aupload_document = mocker.AsyncMock(return_value="documents/doc-123")
+
+    return _VideoPipeline(
+        state_manager=StateManager(state_dir=tmp_path),
+        state=PlaylistState.create("PLtest", "stores/test-123"),
+        transcript_retriever=retriever,
+        transformer=transformer,
+        uploader=uploader,
+        file_search_store="stores/test-123",
+        on_done=lambda video, status: outcomes.__setitem__(video.video_id, status),
+    )
+
+
+def _video(video_id: str) -> VideoInfo:
+    """VideoInfo for a test video."""
+    return VideoInfo(video_id=video_id, title=f"Video {video_id}", url="")
+
+
+def _processed(video_id: str, content_hash: str) -> ProcessedVideo:
+    """Record of an earlier successful upload of a test video."""
+    return ProcessedVideo.create(
+        video_id=video_id,
+        title=f"Video {video_id}",
+        gemini_file_name=f"youtube-{video_id}",
+        content_hash=content_hash,
+    )
+
+
+@pytest.fixture
+def cli(mocker, monkeypatch, tmp_path):
+    """Stub collaborators of the process command, with state kept under tmp_path."""
+    monkeypatch.setenv("GOOGLE_API_KEY", "mock-gemini-api-key")
+    get_api_key.cache_clear()
+    state_manager = StateManager(state_dir=tmp_path)
+    mocker.patch("youtube_knowledge.cli.StateManager", return_value=state_manager)
+    fetcher = mocker.patch("youtube_knowledge.cli.PlaylistFetcher").return_value
+    fetcher.fetch_playlist.return_value = ("Test Playlist", [_video("v1"), _video("v2")], 0)
+    retriever = mocker.patch("youtube_knowledge.cli.TranscriptRetriever").return_value
+    retriever.get_transcript_and_format.return_value = (["segment"], "[00:00] segment")
+    transformer = mocker.patch("youtube_knowledge.cli.TranscriptTransformer").return_value
+    transformer.atransform = mocker.AsyncMock(return_value=TRANSFORMED)
+    uploader = mocker.patch("youtube_knowledge.cli.GeminiUploader").return_value
+    uploader.get_or_create_file_search_store.return_value = "stores/test-123"
+    uploader.aupload_document = mocker.AsyncMock(return_value="documents/doc-123")
+
+    yield SimpleNamespace(
+        state_manager=state_manager, fetcher=fetcher, transformer=transformer, uploader=uploader
+    )
+    get_api_key.cache_clear()
+
+
+class TestVideoPipeline:
+    """Tests for the fetch -> transform -> upload pipeline."""
+
+    def test_run_processes_every_video(self, pipeline, outcomes):
+        """Test that more videos than workers all pass through and every stage shuts down."""
+        videos = [_video(f"v{i}") for i in range(20)]
+
+        asyncio.run(pipeline.run(videos))
+
+        assert outcomes == {video.video_id: "processed" for video in videos}
+        assert pipeline.state.processed_ids() == set(outcomes)
+
+    def test_failed_fetch(self, pipeline, outcomes):
+        """Test that a video without a transcript is recorded as failed and goes no further."""
+        pipeline.transcript_retriever.get_transcript_and_format.side_effect = lambda video_id: (
+            None if video_id == "bad" else (["segment"], "[00:00] segment")
+        )
+
+        asyncio.run(pipeline.run([_video("bad"), _video("v1")]))
+
+        assert outcomes == {"bad": "failed", "v1": "processed"}
+        assert pipeline.state.failed_videos == {"bad": "Failed to retrieve transcript"}
+        pipeline.transformer.atransform.assert_awaited_once()
+
+    def test_failed_upload(self, pipeline, outcomes):
+        """Test that a video whose upload fails is recorded as failed, not processed."""
+        pipeline.uploader.aupload_document.return_value = None
+
+        asyncio.run(pipeline.run([_video("v1")]))
+
+        assert outcomes == {"v1": "failed"}
+        assert pipeline.state.failed_videos == {"v1": "Failed to upload to Gemini"}
+        assert "v1" not in pipeline.state.processed_videos
+
+    def test_reprocess_unchanged_content(self, pipeline, outcomes):
+        """Test that content identical to the last upload is skipped."""
+        pipeline.state.add_processed(_processed("v1", _content_hash(TRANSFORMED)))
+
+        asyncio.run(pipeline.run([_video("v1")]))
+
+        assert outcomes == {"v1": "skipped"}
+        pipeline.uploader.aupload_document.assert_not_awaited()
+
+    def test_reprocess_changed_content(self, pipeline, outcomes):
+        """Test that changed content is uploaded without matching the old document by name."""
+        pipeline.state.add_processed(_processed("v1", _content_hash("# Old")))
+
+        asyncio.run(pipeline.run([_video("v1")]))
+
+        assert outcomes == {"v1": "processed"}
+        upload_kwargs = pipeline.uploader.aupload_document.await_args.kwargs
+        assert upload_kwargs["check_existing"] is False
+        recorded = pipeline.state.processed_videos["v1"]
+        assert recorded.content_hash == _content_hash(TRANSFORMED)
+
+    def test_first_upload_checks_existing(self, pipeline, outcomes):
+        """Test that a video never uploaded before may reuse an existing document."""
+        asyncio.run(pipeline.run([_video("v1")]))
+
+        assert outcomes == {"v1": "processed"}
+        assert pipeline.uploader.aupload_document.await_args.kwargs["check_existing"] is True
+
+
+class TestProcessCommand:
+    """Tests for the process command."""
+
+    def test_skips_processed_videos(self, cli):
+        """Test that processed videos are left out of the fetch and counted as skipped."""
+        state = PlaylistState.create("PLtest", "stores/test-123")
+        state.add_processed(_processed("v1", _content_hash(TRANSFORMED)))
+        cli.state_manager.save(state)
+        cli.fetcher.fetch_playlist.return_value = ("Test Playlist", [_video("v2")], 1)
+
+        result = CliRunner().invoke(process, ["--playlist-id", "PLtest"])
+
+        assert result.exit_code == 0, result.output
+        cli.fetcher.fetch_playlist.assert_called_once_with("PLtest", {"v1"})
+        assert "Processed: 1" in result.output
+        assert "Skipped: 1" in result.output
+        assert cli.state_manager.load("PLtest").processed_ids() == {"v1", "v2"}
+
+    def test_reprocess(self, cli):
+        """Test that --reprocess fetches every video and re-uploads changed content."""
+        state = PlaylistState.create("PLtest", "stores/test-123")
+        state.add_processed(_processed("v1", _content_hash("# Old")))
+        cli.state_manager.save(state)
+
+        result = CliRunner().invoke(process, ["--playlist-id", "PLtest", "--reprocess"])
+
+        assert result.exit_code == 0, result.output
+        cli.fetcher.fetch_playlist.assert_called_once_with("PLtest", None)
+        assert "Processed: 2" in result.output
+        assert cli.uploader.aupload_document.await_count == 2
+
+    def test_compacts_state_on_failure(self, mocker, cli):
+        """Test that the change log is folded into the state file even when the run fails."""
+        compact = mocker.spy(cli.state_manager, "compact")
+        cli.transformer.atransform.side_effect = RuntimeError("transform crashed")
+
+        result = CliRunner().invoke(process, ["--playlist-id", "PLtest"])
+
+        assert result.exit_code == 1
+        assert "Error:" in result.output
+        compact.assert_called_once()
@@ -1,5 +1,7 @@
 """Tests for data models."""
 
+import msgspec
+
 from youtube_knowledge.models import (
     PlaylistState,
     ProcessedVideo,
@@ -79,6 +81,7 @@ class TestProcessedVideo:
         assert video.transcript_length == 1000
         assert video.transformed_length == 1500
         assert video.error is None
+        assert video.content_hash is None
         assert isinstance(video.processed_at, str)
 
     def test_processed_video_creation_with_error(self):
@@ -96,6 +99,21 @@ class TestProcessedVideo:
         assert video.transcript_length == 0
         assert video.transformed_length == 0
 
+    def test_processed_video_content_hash_round_trip(self):
+        """Test that the content hash survives encoding, and old records decode without it."""
+        video = ProcessedVideo.create(
+            video_id="test123",
+            title="Test Video",
+            gemini_file_name="test123.md",
+            content_hash="abc123",
+        )
+
+        decoded = msgspec.json.decode(msgspec.json.encode(video), type=ProcessedVideo)
+        assert decoded.content_hash == "abc123"
+
+        legacy = msgspec.json.encode(video).replace(b',"content_hash":"abc123"', b"")
+        assert msgspec.json.decode(legacy, type=ProcessedVideo).content_hash is None
+
 
 class TestPlaylistState:
     """Tests for PlaylistState model."""
@@ -142,6 +160,20 @@ class TestPlaylistState:
 
         assert state.is_processed("error123") is False
 
+    def test_processed_ids(self):
+        """Test that processed_ids holds exactly the successfully processed videos."""
+        state = PlaylistState.create(playlist_id="PL123", file_search_store_name="test-store")
+        state.add_processed(
+            ProcessedVideo.create(video_id="ok", title="OK", gemini_file_name="ok.md")
+        )
+        state.add_processed(
+            ProcessedVideo.create(
+                video_id="bad", title="Bad", gemini_file_name="bad.md", error="Upload failed"
+            )
+        )
+
+        assert state.processed_ids() == {"ok"}
+
     def test_add_processed_updates_timestamp(self):
         """Test that adding a processed video updates the last_updated timestamp."""
         state = PlaylistState.create(playlist_id="PL123", file_search_store_name="test-store")
@@ -159,6 +191,19 @@ class TestPlaylistState:
         assert state.last_updated >= original_timestamp
         assert "test123" in state.processed_videos
 
+    def test_add_with_shared_timestamp(self):
+        """Test that a timestamp passed in is used instead of the current time."""
+        state = PlaylistState.create(playlist_id="PL123", file_search_store_name="test-store")
+        now = "2024-01-01T00:00:00"
+
+        state.add_processed(
+            ProcessedVideo.create(video_id="a", title="A", gemini_file_name="a.md"), now
+        )
+        assert state.last_updated == now
+
+        state.add_failed("b", "No transcript available", now="2024-01-02T00:00:00")
+        assert state.last_updated == "2024-01-02T00:00:00"
+
     def test_add_failed_video(self):
         """Test adding a failed video to the state."""
         state = PlaylistState.create(playlist_id="PL123", file_search_store_name="test-store")
@@ -1,7 +1,8 @@
 """Tests for playlist video fetching."""
 
+import copy
+
 import pytest
-import yt_dlp
 
 from youtube_knowledge.models import VideoInfo
 from youtube_knowledge.playlist import PlaylistFetcher
@@ -17,45 +18,35 @@ class TestPlaylistFetcher:
         assert fetcher.ydl_opts == {
             "quiet": True,
             "no_warnings": True,
-            "extract_flat": True,
+            "extract_flat": "in_playlist",
         }
 
-    def test_get_playlist_url_from_id(self):
+    def test_get_playlist_url_from_id(self, fetcher):
         """Test converting playlist ID to URL."""
-        fetcher = PlaylistFetcher()
-
         url = fetcher._get_playlist_url("PLtest123")
 
         assert url == "https://www.youtube.com/playlist?list=PLtest123"
 
-    def test_get_playlist_url_from_full_url(self):
+    def test_get_playlist_url_from_full_url(self, fetcher):
         """Test handling of full playlist URL."""
-        fetcher = PlaylistFetcher()
         full_url = "https://www.youtube.com/playlist?list=PLtest123"
 
         url = fetcher._get_playlist_url(full_url)
 
         assert url == full_url
 
-    def test_get_playlist_url_from_url_with_params(self):
+    def test_get_playlist_url_from_url_with_params(self, fetcher):
         """Test extracting playlist ID from URL with extra parameters."""
-        fetcher = PlaylistFetcher()
-
         url = fetcher._get_playlist_url("list=PLtest123&index=1&t=5s")
 
         assert url == "https://www.youtube.com/playlist?list=PLtest123"
 
-    def test_fetch_videos_success(self, mocker, sample_playlist_id, sample_playlist_data):
+    def test_fetch_videos_success(
+        self, fetcher, fake_ydl, sample_playlist_id, sample_playlist_data
+    ):
         """Test successful playlist video fetching."""
-        # Mock yt_dlp.YoutubeDL context manager
-        mock_ydl = mocker.MagicMock()
-        mock_ydl.extract_info.return_value = sample_playlist_data
-        mock_ydl.__enter__ = mocker.MagicMock(return_value=mock_ydl)
-        mock_ydl.__exit__ = mocker.MagicMock(return_value=False)
+        fake_ydl(info=sample_playlist_data)
 
-        mocker.patch.object(yt_dlp, "YoutubeDL", return_value=mock_ydl)
-
-        fetcher = PlaylistFetcher()
         videos = fetcher.fetch_videos(sample_playlist_id)
 
         assert len(videos) == 3
@@ -65,10 +56,12 @@ class TestPlaylistFetcher:
         assert videos[1].video_id == "video2"
         assert videos[2].video_id == "video3"
 
-    def test_fetch_videos_with_none_entries(self, mocker, sample_playlist_id, sample_playlist_data):
+    def test_fetch_videos_with_none_entries(
+        self, fetcher, fake_ydl, sample_playlist_id, sample_playlist_data
+    ):
         """Test fetching playlist with some deleted/private videos (None entries)."""
         # Add None entries to simulate deleted/private videos
-        playlist_data = sample_playlist_data.copy()
+        playlist_data = copy.deepcopy(dict(sample_playlist_data))
         playlist_data["entries"] = [
             playlist_data["entries"][0],
             None,  # Deleted video
@@ -76,46 +69,25 @@ class TestPlaylistFetcher:
             None,  # Private video
             playlist_data["entries"][2],
         ]
+        fake_ydl(info=playlist_data)
 
-        mock_ydl = mocker.MagicMock()
-        mock_ydl.extract_info.return_value = playlist_data
-        mock_ydl.__enter__ = mocker.MagicMock(return_value=mock_ydl)
-        mock_ydl.__exit__ = mocker.MagicMock(return_value=False)
-
-        mocker.patch.object(yt_dlp, "YoutubeDL", return_value=mock_ydl)
-
-        fetcher = PlaylistFetcher()
         videos = fetcher.fetch_videos(sample_playlist_id)
 
         # Should skip None entries
         assert len(videos) == 3
 
-    def test_fetch_videos_no_info(self, mocker, sample_playlist_id):
+    def test_fetch_videos_no_info(self, fetcher, fake_ydl, sample_playlist_id):
         """Test handling of no playlist information returned."""
-        mock_ydl = mocker.MagicMock()
-        mock_ydl.extract_info.return_value = None
-        mock_ydl.__enter__ = mocker.MagicMock(return_value=mock_ydl)
-        mock_ydl.__exit__ = mocker.MagicMock(return_value=False)
-
-        mocker.patch.object(yt_dlp, "YoutubeDL", return_value=mock_ydl)
-
-        fetcher = PlaylistFetcher()
+        fake_ydl(info=None)
 
         with pytest.raises(Exception) as exc_info:
             fetcher.fetch_videos(sample_playlist_id)
 
         assert "No information found" in str(exc_info.value)
 
-    def test_fetch_videos_yt_dlp_exception(self, mocker, sample_playlist_id):
+    def test_fetch_videos_yt_dlp_exception(self, fetcher, fake_ydl, sample_playlist_id):
         """Test handling of yt-dlp exceptions."""
-        mock_ydl = mocker.MagicMock()
-        mock_ydl.extract_info.side_effect = Exception("yt-dlp error")
-        mock_ydl.__enter__ = mocker.MagicMock(return_value=mock_ydl)
-        mock_ydl.__exit__ = mocker.MagicMock(return_value=False)
-
-        mocker.patch.object(yt_dlp, "YoutubeDL", return_value=mock_ydl)
-
-        fetcher = PlaylistFetcher()
+        fake_ydl(exc=Exception("yt-dlp error"))
 
         with pytest.raises(Exception) as exc_info:
             fetcher.fetch_videos(sample_playlist_id)
@@ -124,93 +96,121 @@ class TestPlaylistFetcher:
         assert "yt-dlp error" in str(exc_info.value)
 
     def test_fetch_videos_handles_malformed_entry(
-        self, mocker, sample_playlist_id, sample_playlist_data
+        self, fetcher, fake_ydl, sample_playlist_id, sample_playlist_data
     ):
         """Test handling of malformed video entries."""
         # Create playlist data with one malformed entry
-        playlist_data = sample_playlist_data.copy()
+        playlist_data = copy.deepcopy(dict(sample_playlist_data))
         playlist_data["entries"] = [
             sample_playlist_data["entries"][0],
             {"id": "malformed"},  # Missing title and url
             sample_playlist_data["entries"][1],
         ]
+        fake_ydl(info=playlist_data)
 
-        mock_ydl = mocker.MagicMock()
-        mock_ydl.extract_info.return_value = playlist_data
-        mock_ydl.__enter__ = mocker.MagicMock(return_value=mock_ydl)
-        mock_ydl.__exit__ = mocker.MagicMock(return_value=False)
-
-        mocker.patch.object(yt_dlp, "YoutubeDL", return_value=mock_ydl)
-
-        fetcher = PlaylistFetcher()
         videos = fetcher.fetch_videos(sample_playlist_id)
 
         # Should still process valid entries
         assert len(videos) == 3  # Including the malformed one with defaults
 
-    def test_get_playlist_title_success(self, mocker, sample_playlist_id, sample_playlist_data):
-        """Test successfully retrieving playlist title."""
-        mock_ydl = mocker.MagicMock()
-        mock_ydl.extract_info.return_value = sample_playlist_data
-        mock_ydl.__enter__ = mocker.MagicMock(return_value=mock_ydl)
-        mock_ydl.__exit__ = mocker.MagicMock(return_value=False)
+    def test_fetch_videos_unreadable_entry(
+        self, fetcher, fake_ydl, sample_playlist_id, sample_playlist_data
+    ):
+        """Test that an entry that can't be read is reported as a playlist fetch error."""
+        playlist_data = copy.deepcopy(dict(sample_playlist_data))
+        playlist_data["entries"] = [sample_playlist_data["entries"][0], "not-an-entry"]
+        fake_ydl(info=playlist_data)
 
-        mocker.patch.object(yt_dlp, "YoutubeDL", return_value=mock_ydl)
+        with pytest.raises(Exception, match="Failed to fetch playlist"):
+            fetcher.fetch_videos(sample_playlist_id)
 
-        fetcher = PlaylistFetcher()
+    def test_fetch_playlist_single_extract(
+        self, fetcher, fake_ydl, sample_playlist_id, sample_playlist_data
+    ):
+        """Test that title and videos come back from one extract_info call."""
+        ydl = fake_ydl(info=sample_playlist_data)
+
+        title, videos, skipped = fetcher.fetch_playlist(sample_playlist_id)
+
+        assert title == "Sample Playlist"
+        assert [video.video_id for video in videos] == ["video1", "video2", "video3"]
+        assert skipped == 0
+        assert len(ydl.calls) == 1
+
+    def test_fetch_playlist_cached(
+        self, mocker, fetcher, fake_ydl, sample_playlist_id, sample_playlist_data
+    ):
+        """Test that a playlist is extracted once and reused until the cache expires."""
+        ydl = fake_ydl(info=sample_playlist_data)
+
+        _title, videos, _skipped = fetcher.fetch_playlist(sample_playlist_id)
         title = fetcher.get_playlist_title(sample_playlist_id)
 
         assert title == "Sample Playlist"
+        assert len(fetcher.fetch_videos(sample_playlist_id)) == len(videos) == 3
+        assert len(ydl.calls) == 1
 
-    def test_get_playlist_title_no_info(self, mocker, sample_playlist_id):
-        """Test handling of missing playlist title."""
-        mock_ydl = mocker.MagicMock()
-        mock_ydl.extract_info.return_value = None
-        mock_ydl.__enter__ = mocker.MagicMock(return_value=mock_ydl)
-        mock_ydl.__exit__ = mocker.MagicMock(return_value=False)
+        mocker.patch("youtube_knowledge.playlist.PLAYLIST_CACHE_TTL_SECONDS", 0)
+        fetcher.fetch_playlist(sample_playlist_id)
 
-        mocker.patch.object(yt_dlp, "YoutubeDL", return_value=mock_ydl)
+        assert len(ydl.calls) == 2
+
+    def test_fetch_playlist_skip_ids(
+        self, fetcher, fake_ydl, sample_playlist_id, sample_playlist_data
+    ):
+        """Test that skipped videos are left out and counted without another extraction."""
+        ydl = fake_ydl(info=sample_playlist_data)
+
+        _title, videos, skipped = fetcher.fetch_playlist(
+            sample_playlist_id, skip_ids={"video1", "video3"}
+        )
+
+        assert [video.video_id for video in videos] == ["video2"]
+        assert skipped == 2
+
+        _title, videos, skipped = fetcher.fetch_playlist(sample_playlist_id)
+        assert (len(videos), skipped) == (3, 0)
+        assert len(ydl.calls) == 1
+
+    def test_get_playlist_title_success(
+        self, fetcher, fake_ydl, sample_playlist_id, sample_playlist_data
+    ):
+        """Test successfully retrieving playlist title."""
+        fake_ydl(info=sample_playlist_data)
+
+        title = fetcher.get_playlist_title(sample_playlist_id)
+
+        assert title == "Sample Playlist"
+
+    def test_get_playlist_title_no_info(self, fetcher, fake_ydl, sample_playlist_id):
+        """Test handling of missing playlist title."""
+        fake_ydl(info=None)
 
-        fetcher = PlaylistFetcher()
         title = fetcher.get_playlist_title(sample_playlist_id)
 
         assert title is None
 
-    def test_get_playlist_title_exception(self, mocker, sample_playlist_id):
+    def test_get_playlist_title_exception(self, fetcher, fake_ydl, sample_playlist_id):
         """Test handling of exceptions when retrieving playlist title."""
-        mock_ydl = mocker.MagicMock()
-        mock_ydl.extract_info.side_effect = Exception("Network error")
-        mock_ydl.__enter__ = mocker.MagicMock(return_value=mock_ydl)
-        mock_ydl.__exit__ = mocker.MagicMock(return_value=False)
-
-        mocker.patch.object(yt_dlp, "YoutubeDL", return_value=mock_ydl)
+        fake_ydl(exc=Exception("Network error"))
 
-        fetcher = PlaylistFetcher()
         title = fetcher.get_playlist_title(sample_playlist_id)
 
         assert title is None
 
     def test_fetch_videos_calls_ydl_correctly(
-        self, mocker, sample_playlist_id, sample_playlist_data
+        self, fetcher, fake_ydl, sample_playlist_id, sample_playlist_data
     ):
         """Test that YoutubeDL is called with correct options."""
-        mock_ydl = mocker.MagicMock()
-        mock_ydl.extract_info.return_value = sample_playlist_data
-        mock_ydl.__enter__ = mocker.MagicMock(return_value=mock_ydl)
-        mock_ydl.__exit__ = mocker.MagicMock(return_value=False)
+        ydl = fake_ydl(info=sample_playlist_data)
 
-        mock_ydl_class = mocker.patch.object(yt_dlp, "YoutubeDL", return_value=mock_ydl)
-
-        fetcher = PlaylistFetcher()
         fetcher.fetch_videos(sample_playlist_id)
 
         # Verify YoutubeDL was called with correct options
-        mock_ydl_class.assert_called_once_with(
-            {"quiet": True, "no_warnings": True, "extract_flat": True}
-        )
+        assert ydl.opts == [{"quiet": True, "no_warnings": True, "extract_flat": "in_playlist"}]
 
         # Verify extract_info was called with correct parameters
-        mock_ydl.extract_info.assert_called_once()
-        call_args = mock_ydl.extract_info.call_args
-        assert "playlist?list=" in call_args[0][0]
-        assert call_args[1]["download"] is False
+        assert len(ydl.calls) == 1
+        url, download = ydl.calls[0]
+        assert "playlist?list=" in url
+        assert download is False
@@ -0,0 +1,178 @@
+"""Tests for playlist state persistence."""
+
+import json
+
+from youtube_knowledge.models import ProcessedVideo
+from youtube_knowledge.state import StateManager
+
+
+class TestStateManager:
+    """Tests for StateManager class."""
+
+    def test_load_missing_returns_none(self, tmp_path):
+        """Test loading state for a playlist that was never saved."""
+        manager = StateManager(state_dir=tmp_path)
+
+        assert manager.load("PLmissing") is None
+
+    def test_state_dir_created_once(self, mocker, tmp_path):
+        """Test that the state directory is created by the first manager only."""
+        state_dir = tmp_path / "playlists"
+        mkdir = mocker.spy(type(state_dir), "mkdir")
+
+        StateManager(state_dir=state_dir)
+        StateManager(state_dir=state_dir)
+
+        assert state_dir.is_dir()
+        mkdir.assert_called_once()
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        """Test that saved state loads back with nested ProcessedVideo records."""
+        manager = StateManager(state_dir=tmp_path)
+        state = manager.get_or_create("PL123", "stores/test-store")
+        state.add_processed(
+            ProcessedVideo.create(
+                video_id="video1",
+                title="First Video",
+                gemini_file_name="youtube-video1",
+                transcript_length=100,
+                transformed_length=200,
+            )
+        )
+        state.add_failed("video2", "Failed to retrieve transcript")
+
+        manager.save(state)
+        loaded = manager.load("PL123")
+
+        assert loaded == state
+        assert isinstance(loaded.processed_videos["video1"], ProcessedVideo)
+        assert loaded.is_processed("video1")
+
+    def test_save_writes_readable_json(self, tmp_path):
+        """Test that the state file stays plain, indented JSON."""
+        manager = StateManager(state_dir=tmp_path)
+        state = manager.get_or_create("PL123", "stores/test-store")
+
+        manager.save(state)
+        raw = (tmp_path / "PL123.json").read_text()
+
+        assert raw.startswith('{\n  "playlist_id"')
+        assert json.loads(raw)["file_search_store_name"] == "stores/test-store"
+
+    def test_load_corrupt_file_returns_none(self, tmp_path):
+        """Test that malformed or incomplete state files are treated as missing."""
+        manager = StateManager(state_dir=tmp_path)
+        (tmp_path / "PLbad.json").write_text("{not json")
+        (tmp_path / "PLpartial.json").write_text('{"playlist_id": "PLpartial"}')
+
+        assert manager.load("PLbad") is None
+        assert manager.load("PLpartial") is None
+
+    def test_save_keeps_backup(self, tmp_path):
+        """Test that saving keeps the previous state as a backup and leaves no temp file."""
+        manager = StateManager(state_dir=tmp_path)
+        state = manager.get_or_create("PL123", "stores/test-store")
+        manager.save(state)
+        state.add_failed("video1", "Failed to retrieve transcript")
+        manager.save(state)
+
+        backup = json.loads((tmp_path / "PL123.json.bak").read_text())
+
+        assert backup["failed_videos"] == {}
+        assert manager.load("PL123").failed_videos == {"video1": "Failed to retrieve transcript"}
+        assert not (tmp_path / "PL123.json.tmp").exists()
+
+    def test_load_falls_back_to_backup(self, tmp_path):
+        """Test that a corrupt state file is recovered from the previous save."""
+        manager = StateManager(state_dir=tmp_path)
+        state = manager.get_or_create("PL123", "stores/test-store")
+        manager.save(state)
+        manager.save(state)
+        (tmp_path / "PL123.json").write_text("{not json")
+
+        assert manager.load("PL123") == state
+
+    def test_record_appends_to_log(self, tmp_path):
+        """Test that changes are appended to the log and replayed on load."""
+        manager = StateManager(state_dir=tmp_path)
+        state = manager.get_or_create("PL123", "stores/test-store")
+        manager.save(state)
+        video = ProcessedVideo.create(
+            video_id="video1",
+            title="First Video",
+            gemini_file_name="youtube-video1",
+        )
+
+        manager.record_processed(state, video)
+        manager.record_failed(state, "video2", "Failed to retrieve transcript")
+
+        log = (tmp_path / "PL123.log.jsonl").read_text().splitlines()
+        snapshot = json.loads((tmp_path / "PL123.json").read_text())
+
+        assert [json.loads(line)["op"] for line in log] == ["processed", "failed"]
+        assert snapshot["processed_videos"] == {}
+        assert StateManager(state_dir=tmp_path).load("PL123") == state
+
+    def test_record_without_state_file_saves_snapshot(self, tmp_path):
+        """Test that the first change to a new playlist writes its state file."""
+        manager = StateManager(state_dir=tmp_path)
+        state = manager.get_or_create("PL123", "stores/test-store")
+
+        manager.record_failed(state, "video1", "Failed to retrieve transcript")
+
+        assert not (tmp_path / "PL123.log.jsonl").exists()
+        assert manager.load("PL123") == state
+
+    def test_log_compacted(self, tmp_path):
+        """Test that the log is folded into the state file once it outgrows the state."""
+        manager = StateManager(state_dir=tmp_path)
+        state = manager.get_or_create("PL123", "stores/test-store")
+        manager.save(state)
+
+        # Repeated failures of one video grow the log but not the state
+        for _ in range(2):
+            manager.record_failed(state, "video1", "Failed to retrieve transcript")
+
+        assert len((tmp_path / "PL123.log.jsonl").read_text().splitlines()) == 2
+
+        manager.record_failed(state, "video1", "Failed to retrieve transcript")
+
+        assert not (tmp_path / "PL123.log.jsonl").exists()
+
+        manager.record_failed(state, "video2", "Failed to retrieve transcript")
+        manager.compact(state)
+
+        assert not (tmp_path / "PL123.log.jsonl").exists()
+        assert manager.load("PL123") == state
+
+    def test_load_skips_partial_log_line(self, tmp_path):
+        """Test that a line cut short by a crash is ignored when replaying the log."""
+        manager = StateManager(state_dir=tmp_path)
+        state = manager.get_or_create("PL123", "stores/test-store")
+        manager.save(state)
+        manager.record_failed(state, "video1", "Failed to retrieve transcript")
+        with (tmp_path / "PL123.log.jsonl").open("a") as f:
+            f.write('{"op": "failed", "video_')
+
+        assert manager.load("PL123").failed_videos == state.failed_videos
+
+    def test_list_playlists(self, tmp_path):
+        """Test listing every saved playlist."""
+        manager = StateManager(state_dir=tmp_path)
+        manager.save(manager.get_or_create("PL1", "stores/one"))
+        manager.save(manager.get_or_create("PL2", "stores/two"))
+
+        playlists = manager.list_playlists()
+
+        assert sorted(p.playlist_id for p in playlists) == ["PL1", "PL2"]
+
+    def test_list_playlists_skips_unreadable(self, tmp_path):
+        """Test that listing ignores corrupt state files and handles an empty directory."""
+        manager = StateManager(state_dir=tmp_path)
+
+        assert manager.list_playlists() == []
+
+        manager.save(manager.get_or_create("PL1", "stores/one"))
+        (tmp_path / "PLbad.json").write_text("{not json")
+
+        assert [p.playlist_id for p in manager.list_playlists()] == ["PL1"]
@@ -1,6 +1,9 @@
 """Tests for transcript retrieval."""
 
-from youtube_transcript_api import YouTubeTranscriptApi
+from types import SimpleNamespace
+
+import pytest
+import requests
 from youtube_transcript_api._errors import (
     NoTranscriptFound,
     TranscriptsDisabled,
@@ -26,30 +29,29 @@ class TestTranscriptRetriever:
 
         assert retriever.languages == ["de", "fr"]
 
-    def test_get_transcript_success(self, mocker, sample_video_id, sample_transcript_data):
+    def test_init_shared_http_client(self):
+        """Test that a shared HTTP session is used for fetching transcripts."""
+        session = requests.Session()
+
+        first = TranscriptRetriever(http_client=session)
+        second = TranscriptRetriever(languages=["de"], http_client=session)
+
+        assert first.api._fetcher._http_client is session
+        assert second.api._fetcher._http_client is session
+
+    def test_get_transcript_success(
+        self, mocker, retriever, sample_video_id, sample_transcript_data
+    ):
         """Test successful transcript retrieval."""
-        # Create mock transcript snippet objects with proper attributes
-        mock_snippets = []
-        for data in sample_transcript_data:
-            snippet = mocker.MagicMock()
-            snippet.text = data["text"]
-            snippet.start = data["start"]
-            snippet.duration = data["duration"]
-            mock_snippets.append(snippet)
-
-        # Mock the instance method on YouTubeTranscriptApi
-        mock_api_instance = mocker.MagicMock()
-        mock_api_instance.fetch.return_value = mock_snippets
-
-        mocker.patch.object(YouTubeTranscriptApi, "__init__", return_value=None)
-        mocker.patch.object(YouTubeTranscriptApi, "fetch", mock_api_instance.fetch)
+        # Lightweight stand-ins for FetchedTranscriptSnippet objects
+        mock_snippets = [SimpleNamespace(**data) for data in sample_transcript_data]
 
-        retriever = TranscriptRetriever()
-        retriever.api = mock_api_instance
+        # Mock only the fetch method on the YouTubeTranscriptApi instance
+        mock_fetch = mocker.patch.object(retriever.api, "fetch", return_value=mock_snippets)
         result = retriever.get_transcript(sample_video_id)
 
         # Verify the mock was called correctly
-        mock_api_instance.fetch.assert_called_once_with(sample_video_id, languages=["en"])
+        mock_fetch.assert_called_once_with(sample_video_id, languages=["en"])
 
         # Verify the result
         assert result is not None
@@ -63,140 +65,132 @@ class TestTranscriptRetriever:
         self, mocker, sample_video_id, sample_transcript_data
     ):
         """Test transcript retrieval with custom languages."""
-        # Create mock transcript snippet objects with proper attributes
-        mock_snippets = []
-        for data in sample_transcript_data:
-            snippet = mocker.MagicMock()
-            snippet.text = data["text"]
-            snippet.start = data["start"]
-            snippet.duration = data["duration"]
-            mock_snippets.append(snippet)
-
-        mock_api_instance = mocker.MagicMock()
-        mock_api_instance.fetch.return_value = mock_snippets
+        # Lightweight stand-ins for FetchedTranscriptSnippet objects
+        mock_snippets = [SimpleNamespace(**data) for data in sample_transcript_data]
 
         retriever = TranscriptRetriever(languages=["de", "en"])
-        retriever.api = mock_api_instance
+        mock_fetch = mocker.patch.object(retriever.api, "fetch", return_value=mock_snippets)
         result = retriever.get_transcript(sample_video_id)
 
-        mock_api_instance.fetch.assert_called_once_with(sample_video_id, languages=["de", "en"])
+        mock_fetch.assert_called_once_with(sample_video_id, languages=["de", "en"])
         assert result is not None
 
-    def test_get_transcript_transcripts_disabled(self, mocker, sample_video_id):
-        """Test handling of transcripts disabled error."""
-        mock_api_instance = mocker.MagicMock()
-        mock_api_instance.fetch.side_effect = TranscriptsDisabled(sample_video_id)
-
-        retriever = TranscriptRetriever()
-        retriever.api = mock_api_instance
+    @pytest.mark.parametrize(
+        "error",
+        [
+            TranscriptsDisabled("dQw4w9WgXcQ"),
+            NoTranscriptFound("dQw4w9WgXcQ", ["en"], {"en": "Not available"}),
+            VideoUnavailable("dQw4w9WgXcQ"),
+            Exception("Unexpected error"),
+        ],
+        ids=["transcripts_disabled", "no_transcript_found", "video_unavailable", "generic"],
+    )
+    def test_get_transcript_error_returns_none(self, mocker, retriever, sample_video_id, error):
+        """Test that every transcript retrieval error is handled by returning None."""
+        mocker.patch.object(retriever.api, "fetch", side_effect=error)
         result = retriever.get_transcript(sample_video_id)
 
         assert result is None
 
-    def test_get_transcript_no_transcript_found(self, mocker, sample_video_id):
-        """Test handling of no transcript found error."""
-        mock_api_instance = mocker.MagicMock()
-        mock_api_instance.fetch.side_effect = NoTranscriptFound(
-            sample_video_id, ["en"], {"en": "Not available"}
-        )
+    def test_get_transcript_and_format(
+        self, mocker, retriever, sample_video_id, sample_transcript_data
+    ):
+        """Test that the fused fetch matches get_transcript plus format_transcript."""
+        mock_snippets = [SimpleNamespace(**data) for data in sample_transcript_data]
+        mocker.patch.object(retriever.api, "fetch", return_value=mock_snippets)
 
-        retriever = TranscriptRetriever()
-        retriever.api = mock_api_instance
-        result = retriever.get_transcript(sample_video_id)
+        transcript, formatted = retriever.get_transcript_and_format(sample_video_id)
 
-        assert result is None
+        assert transcript == retriever.get_transcript(sample_video_id)
+        assert formatted == retriever.format_transcript(transcript)
 
-    def test_get_transcript_video_unavailable(self, mocker, sample_video_id):
-        """Test handling of video unavailable error."""
-        mock_api_instance = mocker.MagicMock()
-        mock_api_instance.fetch.side_effect = VideoUnavailable(sample_video_id)
+    def test_get_transcript_and_format_error_returns_none(self, mocker, retriever, sample_video_id):
+        """Test that the fused fetch handles errors like get_transcript."""
+        mocker.patch.object(
+            retriever.api, "fetch", side_effect=TranscriptsDisabled(sample_video_id)
+        )
 
-        retriever = TranscriptRetriever()
-        retriever.api = mock_api_instance
-        result = retriever.get_transcript(sample_video_id)
+        assert retriever.get_transcript_and_format(sample_video_id) is None
 
-        assert result is None
+    def test_get_transcripts_bulk(self, mocker, retriever, sample_transcript_data):
+        """Test fetching several transcripts concurrently with per-video error handling."""
+        snippets = [SimpleNamespace(**data) for data in sample_transcript_data]
 
-    def test_get_transcript_generic_exception(self, mocker, sample_video_id):
-        """Test handling of generic exception during transcript retrieval."""
-        mock_api_instance = mocker.MagicMock()
-        mock_api_instance.fetch.side_effect = Exception("Unexpected error")
+        def fake_fetch(video_id, languages):
+            if video_id == "disabled":
+                raise TranscriptsDisabled(video_id)
+            return snippets
 
-        retriever = TranscriptRetriever()
-        retriever.api = mock_api_instance
-        result = retriever.get_transcript(sample_video_id)
+        mocker.patch.object(retriever.api, "fetch", side_effect=fake_fetch)
 
-        assert result is None
+        result = retriever.get_transcripts_bulk(["video1", "disabled", "video2"], concurrency=2)
+
+        assert list(result) == ["video1", "disabled", "video2"]
+        assert result["disabled"] is None
+        assert len(result["video1"]) == 3
+        assert result["video2"][0].text == "Hello world"
 
-    def test_format_transcript(self, sample_transcript_entries):
+    def test_format_transcript(self, retriever, sample_transcript_entries):
         """Test formatting transcript with timestamps."""
-        retriever = TranscriptRetriever()
         formatted = retriever.format_transcript(sample_transcript_entries)
 
         assert "[00:00] Hello world" in formatted
         assert "[00:02] This is a test" in formatted
         assert "[00:05] Sample transcript" in formatted
 
-    def test_format_transcript_plain(self, sample_transcript_entries):
+    def test_format_transcript_plain(self, retriever, sample_transcript_entries):
         """Test formatting transcript as plain text without timestamps."""
-        retriever = TranscriptRetriever()
         plain = retriever.format_transcript_plain(sample_transcript_entries)
 
         assert plain == "Hello world This is a test Sample transcript"
 
-    def test_format_timestamp_seconds_only(self):
-        """Test timestamp formatting for times under 1 minute."""
-        retriever = TranscriptRetriever()
-
-        assert retriever._format_timestamp(0) == "00:00"
-        assert retriever._format_timestamp(30) == "00:30"
-        assert retriever._format_timestamp(59) == "00:59"
-
-    def test_format_timestamp_minutes_and_seconds(self):
-        """Test timestamp formatting for times under 1 hour."""
-        retriever = TranscriptRetriever()
-
-        assert retriever._format_timestamp(60) == "01:00"
-        assert retriever._format_timestamp(90) == "01:30"
-        assert retriever._format_timestamp(3599) == "59:59"
-
-    def test_format_timestamp_hours(self):
-        """Test timestamp formatting for times over 1 hour."""
-        retriever = TranscriptRetriever()
-
-        assert retriever._format_timestamp(3600) == "01:00:00"
-        assert retriever._format_timestamp(3661) == "01:01:01"
-        assert retriever._format_timestamp(7384) == "02:03:04"
-
-    def test_api_is_instantiated(self):
+    @pytest.mark.parametrize(
+        ("seconds", "expected"),
+        [
+            # Under 1 minute
+            (0, "00:00"),
+            (30, "00:30"),
+            (59, "00:59"),
+            # Under 1 hour
+            (60, "01:00"),
+            (90, "01:30"),
+            (3599, "59:59"),
+            # Over 1 hour
+            (3600, "01:00:00"),
+            (3661, "01:01:01"),
+            (7384, "02:03:04"),
+        ],
+    )
+    def test_format_timestamp(self, retriever, seconds, expected):
+        """Test timestamp formatting as MM:SS, or HH:MM:SS from one hour up."""
+        assert retriever._format_timestamp(seconds) == expected
+
+    def test_api_is_instantiated(self, retriever):
         """Test that YouTubeTranscriptApi is properly instantiated.
 
         This test ensures the API is instantiated as required by the library.
         """
-        retriever = TranscriptRetriever()
-
         # The retriever should have an 'api' attribute
         assert hasattr(retriever, "api")
 
         # It should also have the languages attribute
         assert hasattr(retriever, "languages")
 
-    def test_uses_instance_method(self, mocker, sample_video_id, sample_transcript_data):
+    def test_uses_instance_method(self, mocker, retriever, sample_video_id, sample_transcript_data):
         """Test that the retriever uses YouTubeTranscriptApi instance method.
 
         This test verifies that get_transcript calls the fetch method on an instance
         of the API, which is the correct usage pattern for youtube-transcript-api.
         """
         # Mock the instance method
-        mock_api_instance = mocker.MagicMock()
-        mock_api_instance.fetch.return_value = sample_transcript_data
+        mock_fetch = mocker.patch.object(
+            retriever.api, "fetch", return_value=sample_transcript_data
+        )
 
-        retriever = TranscriptRetriever()
-        retriever.api = mock_api_instance
         retriever.get_transcript(sample_video_id)
 
         # Verify that the instance method was called
-        mock_api_instance.fetch.assert_called_once()
+        mock_fetch.assert_called_once()
 
         # Verify it was called with correct parameters
-        mock_api_instance.fetch.assert_called_with(sample_video_id, languages=["en"])
+        mock_fetch.assert_called_with(sample_video_id, languages=["en"])
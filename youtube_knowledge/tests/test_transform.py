@@ -1,5 +1,8 @@
 """Tests for transcript transformation using Gemini."""
 
+import asyncio
+from types import SimpleNamespace
+
 from google import genai
 
 from youtube_knowledge.transform import TranscriptTransformer
@@ -8,14 +11,14 @@ from youtube_knowledge.transform import TranscriptTransformer
 class TestTranscriptTransformer:
     """Tests for TranscriptTransformer class."""
 
-    def test_init(self, mock_gemini_api_key):
+    def test_init(self, mock_genai_client, mock_gemini_api_key):
         """Test TranscriptTransformer initialization."""
         transformer = TranscriptTransformer(api_key=mock_gemini_api_key)
 
         assert transformer.model == "gemini-2.0-flash-exp"
-        assert transformer.client is not None
+        assert transformer.client is mock_genai_client
 
-    def test_init_custom_model(self, mock_gemini_api_key):
+    def test_init_custom_model(self, mock_genai_client, mock_gemini_api_key):
         """Test TranscriptTransformer initialization with custom model."""
         transformer = TranscriptTransformer(api_key=mock_gemini_api_key, model="gemini-1.5-pro")
 
@@ -23,24 +26,15 @@ class TestTranscriptTransformer:
 
     def test_transform_success(
         self,
-        mocker,
-        mock_gemini_api_key,
+        mock_genai_client,
+        transformer,
+        sample_mock_response,
         sample_video_info,
         sample_transcript_entries,
-        sample_transformed_content,
     ):
         """Test successful transcript transformation."""
-        # Create a mock response object
-        mock_response = mocker.MagicMock()
-        mock_response.text = sample_transformed_content
-
-        # Mock the Gemini client
-        mock_client = mocker.MagicMock()
-        mock_client.models.generate_content.return_value = mock_response
+        mock_genai_client.models.generate_content.return_value = sample_mock_response
 
-        mocker.patch.object(genai, "Client", return_value=mock_client)
-
-        transformer = TranscriptTransformer(api_key=mock_gemini_api_key)
         formatted_transcript = "[00:00] Hello world\n[00:02] This is a test"
 
         result = transformer.transform(
@@ -54,30 +48,25 @@ class TestTranscriptTransformer:
         assert "title: Sample Video Title" in result
         assert "video_id: dQw4w9WgXcQ" in result
         assert "video_url:" in result
-        assert sample_transformed_content in result
+        assert sample_mock_response.text in result
 
         # Verify the client was called correctly
-        mock_client.models.generate_content.assert_called_once()
-        call_kwargs = mock_client.models.generate_content.call_args[1]
+        mock_genai_client.models.generate_content.assert_called_once()
+        call_kwargs = mock_genai_client.models.generate_content.call_args[1]
         assert call_kwargs["model"] == "gemini-2.0-flash-exp"
         assert "Sample Video Title" in call_kwargs["contents"]
         assert formatted_transcript in call_kwargs["contents"]
 
     def test_transform_no_response(
         self,
-        mocker,
-        mock_gemini_api_key,
+        mock_genai_client,
+        transformer,
         sample_video_info,
         sample_transcript_entries,
     ):
         """Test handling of no response from Gemini."""
-        # Mock the Gemini client to return None
-        mock_client = mocker.MagicMock()
-        mock_client.models.generate_content.return_value = None
-
-        mocker.patch.object(genai, "Client", return_value=mock_client)
+        mock_genai_client.models.generate_content.return_value = None
 
-        transformer = TranscriptTransformer(api_key=mock_gemini_api_key)
         formatted_transcript = "[00:00] Hello world"
 
         result = transformer.transform(
@@ -90,22 +79,14 @@ class TestTranscriptTransformer:
 
     def test_transform_empty_response_text(
         self,
-        mocker,
-        mock_gemini_api_key,
+        mock_genai_client,
+        transformer,
         sample_video_info,
         sample_transcript_entries,
     ):
         """Test handling of empty response text from Gemini."""
-        # Create a mock response with empty text
-        mock_response = mocker.MagicMock()
-        mock_response.text = ""
-
-        mock_client = mocker.MagicMock()
-        mock_client.models.generate_content.return_value = mock_response
-
-        mocker.patch.object(genai, "Client", return_value=mock_client)
+        mock_genai_client.models.generate_content.return_value = SimpleNamespace(text="")
 
-        transformer = TranscriptTransformer(api_key=mock_gemini_api_key)
         formatted_transcript = "[00:00] Hello world"
 
         result = transformer.transform(
@@ -118,19 +99,14 @@ class TestTranscriptTransformer:
 
     def test_transform_exception(
         self,
-        mocker,
-        mock_gemini_api_key,
+        mock_genai_client,
+        transformer,
         sample_video_info,
         sample_transcript_entries,
     ):
         """Test handling of exception during transformation."""
-        # Mock the Gemini client to raise an exception
-        mock_client = mocker.MagicMock()
-        mock_client.models.generate_content.side_effect = Exception("API error")
-
-        mocker.patch.object(genai, "Client", return_value=mock_client)
+        mock_genai_client.models.generate_content.side_effect = Exception("API error")
 
-        transformer = TranscriptTransformer(api_key=mock_gemini_api_key)
         formatted_transcript = "[00:00] Hello world"
 
         result = transformer.transform(
@@ -141,21 +117,19 @@ class TestTranscriptTransformer:
 
         assert result is None
 
-    def test_add_metadata_header(
-        self, mocker, mock_gemini_api_key, sample_video_info, sample_transformed_content
+    def test_transform_prompt_too_long(
+        self, mocker, mock_genai_client, transformer, sample_video_info
     ):
-        """Test metadata header is correctly added to transformed content."""
-        # Mock the Gemini client
-        mock_response = mocker.MagicMock()
-        mock_response.text = sample_transformed_content
-
-        mock_client = mocker.MagicMock()
-        mock_client.models.generate_content.return_value = mock_response
+        """Test that oversized prompts are rejected without calling Gemini."""
+        mocker.patch("youtube_knowledge.transform.MAX_PROMPT_CHARS", 100)
 
-        mocker.patch.object(genai, "Client", return_value=mock_client)
+        result = transformer.transform(sample_video_info, [], "[00:00] Hello world")
 
-        transformer = TranscriptTransformer(api_key=mock_gemini_api_key)
+        assert result is None
+        mock_genai_client.models.generate_content.assert_not_called()
 
+    def test_add_metadata_header(self, transformer, sample_video_info, sample_transformed_content):
+        """Test metadata header is correctly added to transformed content."""
         # Test the internal method
         result = transformer._add_metadata_header(sample_video_info, sample_transformed_content)
 
@@ -173,21 +147,15 @@ class TestTranscriptTransformer:
 
     def test_transform_prompt_includes_all_info(
         self,
-        mocker,
-        mock_gemini_api_key,
+        mock_genai_client,
+        transformer,
+        sample_mock_response,
         sample_video_info,
         sample_transcript_entries,
     ):
         """Test that transformation prompt includes all necessary information."""
-        mock_response = mocker.MagicMock()
-        mock_response.text = "Transformed content"
-
-        mock_client = mocker.MagicMock()
-        mock_client.models.generate_content.return_value = mock_response
+        mock_genai_client.models.generate_content.return_value = sample_mock_response
 
-        mocker.patch.object(genai, "Client", return_value=mock_client)
-
-        transformer = TranscriptTransformer(api_key=mock_gemini_api_key)
         formatted_transcript = "[00:00] Hello world\n[00:02] This is a test"
 
         transformer.transform(
@@ -197,7 +165,7 @@ class TestTranscriptTransformer:
         )
 
         # Get the prompt that was sent to Gemini
-        call_kwargs = mock_client.models.generate_content.call_args[1]
+        call_kwargs = mock_genai_client.models.generate_content.call_args[1]
         prompt = call_kwargs["contents"]
 
         # Verify all necessary information is in the prompt
@@ -218,4 +186,81 @@ class TestTranscriptTransformer:
 
         TranscriptTransformer(api_key=mock_gemini_api_key)
 
-        mock_client_class.assert_called_once_with(api_key=mock_gemini_api_key)
+        mock_client_class.assert_called_once_with(
+            api_key=mock_gemini_api_key, http_options=mocker.ANY
+        )
+        # Idle connections outlive the default 5 second keep-alive
+        http_options = mock_client_class.call_args.kwargs["http_options"]
+        assert http_options.client_args["limits"].keepalive_expiry == 60
+        assert http_options.async_client_args["limits"].keepalive_expiry == 60
+
+    def test_client_shared_across_instances(self, mocker, mock_gemini_api_key):
+        """Test that instances built with the same API key share one Gemini client."""
+        mock_client_class = mocker.patch.object(genai, "Client")
+
+        first = TranscriptTransformer(api_key=mock_gemini_api_key)
+        second = TranscriptTransformer(api_key=mock_gemini_api_key, model="gemini-1.5-pro")
+
+        assert first.client is second.client
+        mock_client_class.assert_called_once_with(
+            api_key=mock_gemini_api_key, http_options=mocker.ANY
+        )
+
+    def test_atransform_success(
+        self,
+        mocker,
+        mock_genai_client,
+        transformer,
+        sample_mock_response,
+        sample_video_info,
+    ):
+        """Test transforming a transcript with the async client."""
+        generate = mocker.AsyncMock(return_value=sample_mock_response)
+        mock_genai_client.aio.models.generate_content = generate
+
+        result = asyncio.run(transformer.atransform(sample_video_info, [], "[00:00] Hello world"))
+
+        assert result is not None
+        assert "title: Sample Video Title" in result
+        assert sample_mock_response.text in result
+        assert "[00:00] Hello world" in generate.call_args[1]["contents"]
+
+    def test_atransform_exception(self, mocker, mock_genai_client, transformer, sample_video_info):
+        """Test handling of exception during async transformation."""
+        mock_genai_client.aio.models.generate_content = mocker.AsyncMock(
+            side_effect=Exception("API error")
+        )
+
+        result = asyncio.run(transformer.atransform(sample_video_info, [], "[00:00] Hello world"))
+
+        assert result is None
+
+    def test_transform_many(self, mock_genai_client, transformer, sample_video_info):
+        """Test concurrent transformation keeps order, isolates errors and bounds concurrency."""
+        in_flight = 0
+        peak = 0
+
+        async def fake_generate(model, contents):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            if "broken" in contents:
+                raise Exception("API error")
+            # Echo the transcript back so results can be matched to their inputs
+            return SimpleNamespace(text=contents.split("## Transcript:\n")[1].split("\n")[0])
+
+        mock_genai_client.aio.models.generate_content = fake_generate
+        items = [
+            (sample_video_info, [], transcript)
+            for transcript in ["first", "broken", "third", "fourth"]
+        ]
+
+        results = asyncio.run(transformer.transform_many(items, max_concurrency=2))
+
+        assert results[0].endswith("first")
+        assert results[1] is None
+        assert results[2].endswith("third")
+        assert results[3].endswith("fourth")
+        assert peak == 2
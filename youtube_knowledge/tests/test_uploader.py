@@ -1,13 +1,20 @@
 """Tests for Gemini file upload functionality."""
 
+import asyncio
+import io
 import tempfile
-from pathlib import Path
-from unittest.mock import MagicMock
+from types import SimpleNamespace
 
 import pytest
 from google import genai
 
-from youtube_knowledge.uploader import GeminiUploader
+from youtube_knowledge.uploader import (
+    POLL_BACKOFF,
+    POLL_INITIAL_DELAY,
+    POLL_JITTER,
+    POLL_MAX_DELAY,
+    GeminiUploader,
+)
 
 
 class TestGeminiUploader:
@@ -19,222 +26,353 @@ class TestGeminiUploader:
 
         uploader = GeminiUploader(api_key=mock_gemini_api_key)
 
-        mock_client_class.assert_called_once_with(api_key=mock_gemini_api_key)
+        mock_client_class.assert_called_once_with(
+            api_key=mock_gemini_api_key, http_options=mocker.ANY
+        )
         assert uploader.client is not None
 
-    def test_get_or_create_file_search_store_existing(self, mocker, mock_gemini_api_key):
+    def test_get_or_create_file_search_store_existing(self, mock_genai_client, uploader):
         """Test getting an existing file search store."""
-        # Create mock store
-        mock_store = MagicMock()
-        mock_store.name = "stores/test-store-123"
-        mock_store.display_name = "Test Store"
-
-        # Mock the client's file_search_stores.list method
-        mock_client = MagicMock()
-        mock_client.file_search_stores.list.return_value = [mock_store]
+        mock_store = SimpleNamespace(name="stores/test-store-123", display_name="Test Store")
+        mock_genai_client.file_search_stores.list.return_value = [mock_store]
 
-        mocker.patch.object(genai, "Client", return_value=mock_client)
-
-        uploader = GeminiUploader(api_key=mock_gemini_api_key)
         result = uploader.get_or_create_file_search_store("Test Store")
 
         assert result == "stores/test-store-123"
-        mock_client.file_search_stores.list.assert_called_once()
-        mock_client.file_search_stores.create.assert_not_called()
+        mock_genai_client.file_search_stores.list.assert_called_once()
+        mock_genai_client.file_search_stores.create.assert_not_called()
 
-    def test_get_or_create_file_search_store_new(self, mocker, mock_gemini_api_key):
+    def test_get_or_create_file_search_store_new(self, mock_genai_client, uploader):
         """Test creating a new file search store."""
-        # Mock store to be created
-        mock_new_store = MagicMock()
-        mock_new_store.name = "stores/new-store-456"
-
-        # Mock the client
-        mock_client = MagicMock()
-        mock_client.file_search_stores.list.return_value = []  # No existing stores
-        mock_client.file_search_stores.create.return_value = mock_new_store
-
-        mocker.patch.object(genai, "Client", return_value=mock_client)
+        mock_genai_client.file_search_stores.create.return_value = SimpleNamespace(
+            name="stores/new-store-456"
+        )
 
-        uploader = GeminiUploader(api_key=mock_gemini_api_key)
         result = uploader.get_or_create_file_search_store("New Store")
 
         assert result == "stores/new-store-456"
-        mock_client.file_search_stores.list.assert_called_once()
-        mock_client.file_search_stores.create.assert_called_once_with(
+        mock_genai_client.file_search_stores.list.assert_called_once()
+        mock_genai_client.file_search_stores.create.assert_called_once_with(
             config={"display_name": "New Store"}
         )
 
-    def test_get_or_create_file_search_store_exception(self, mocker, mock_gemini_api_key):
-        """Test handling of exception when creating file search store."""
-        mock_client = MagicMock()
-        mock_client.file_search_stores.list.side_effect = Exception("API error")
+    def test_get_or_create_file_search_store_uses_index(self, mock_genai_client, uploader):
+        """Test that stores are listed once and created stores join the index."""
+        stores = mock_genai_client.file_search_stores
+        stores.list.return_value = [
+            SimpleNamespace(name="stores/test-store-123", display_name="Test Store")
+        ]
+        stores.create.return_value = SimpleNamespace(name="stores/new-store-456")
 
-        mocker.patch.object(genai, "Client", return_value=mock_client)
+        assert uploader.get_or_create_file_search_store("Test Store") == "stores/test-store-123"
+        assert uploader.get_or_create_file_search_store("New Store") == "stores/new-store-456"
+        assert uploader.get_or_create_file_search_store("New Store") == "stores/new-store-456"
 
-        uploader = GeminiUploader(api_key=mock_gemini_api_key)
+        stores.list.assert_called_once()
+        stores.create.assert_called_once()
+
+    def test_get_or_create_file_search_store_exception(self, mock_genai_client, uploader):
+        """Test handling of exception when creating file search store."""
+        mock_genai_client.file_search_stores.list.side_effect = Exception("API error")
 
         with pytest.raises(Exception) as exc_info:
             uploader.get_or_create_file_search_store("Test Store")
 
         assert "Failed to get or create file search store" in str(exc_info.value)
 
-    def test_check_existing_file_found(self, mocker, mock_gemini_api_key):
+    def test_check_existing_file_found(self, mock_genai_client, uploader, make_file):
         """Test checking for an existing file that exists."""
-        # Create mock files
-        mock_file1 = MagicMock()
-        mock_file1.name = "files/file-123"
-        mock_file1.display_name = "existing.md"
-
-        mock_file2 = MagicMock()
-        mock_file2.name = "files/file-456"
-        mock_file2.display_name = "other.md"
+        mock_file1 = make_file("files/file-123", "existing.md")
+        mock_file2 = make_file("files/file-456", "other.md")
 
-        mock_client = MagicMock()
-        mock_client.files.list.return_value = [mock_file1, mock_file2]
+        mock_genai_client.files.list.return_value = [mock_file1, mock_file2]
 
-        mocker.patch.object(genai, "Client", return_value=mock_client)
-
-        uploader = GeminiUploader(api_key=mock_gemini_api_key)
         result = uploader._check_existing_file("existing.md")
 
         assert result == "files/file-123"
 
-    def test_check_existing_file_not_found(self, mocker, mock_gemini_api_key):
-        """Test checking for a file that doesn't exist."""
-        mock_file = MagicMock()
-        mock_file.display_name = "other.md"
+    def test_check_existing_file_uses_index(self, mocker, mock_genai_client, uploader, make_file):
+        """Test that files are listed once and later lookups hit the index until it expires."""
+        mock_genai_client.files.list.return_value = [
+            make_file("files/file-123", "existing.md"),
+            make_file("files/file-456", "other.md"),
+        ]
 
-        mock_client = MagicMock()
-        mock_client.files.list.return_value = [mock_file]
+        assert uploader._check_existing_file("existing.md") == "files/file-123"
+        assert uploader._check_existing_file("other.md") == "files/file-456"
+        assert uploader._check_existing_file("missing.md") is None
+        assert mock_genai_client.files.list.call_count == 1
 
-        mocker.patch.object(genai, "Client", return_value=mock_client)
+        uploader.refresh_file_index()
+        uploader._check_existing_file("existing.md")
+
+        assert mock_genai_client.files.list.call_count == 2
+
+        mocker.patch("youtube_knowledge.uploader.FILE_INDEX_TTL_SECONDS", 0)
+        uploader._check_existing_file("existing.md")
+
+        assert mock_genai_client.files.list.call_count == 3
+
+    def test_filter_new(self, mock_genai_client, uploader, make_file):
+        """Test that filter_new keeps only names without a file, from a single listing."""
+        mock_genai_client.files.list.return_value = [
+            make_file("files/file-123", "existing.md"),
+        ]
+
+        assert uploader.filter_new(["existing.md", "new.md", "other.md"]) == {"new.md", "other.md"}
+        mock_genai_client.files.list.assert_called_once()
+
+    def test_check_existing_file_not_found(self, mock_genai_client, uploader, make_file):
+        """Test checking for a file that doesn't exist."""
+        mock_file = make_file("files/other-789", "other.md")
+        mock_genai_client.files.list.return_value = [mock_file]
 
-        uploader = GeminiUploader(api_key=mock_gemini_api_key)
         result = uploader._check_existing_file("nonexistent.md")
 
         assert result is None
 
-    def test_check_existing_file_exception(self, mocker, mock_gemini_api_key):
+    def test_check_existing_file_exception(self, mock_genai_client, uploader):
         """Test handling of exception when checking for existing file."""
-        mock_client = MagicMock()
-        mock_client.files.list.side_effect = Exception("List error")
-
-        mocker.patch.object(genai, "Client", return_value=mock_client)
+        mock_genai_client.files.list.side_effect = Exception("List error")
 
-        uploader = GeminiUploader(api_key=mock_gemini_api_key)
         result = uploader._check_existing_file("test.md")
 
         # Should return None on exception
         assert result is None
 
-    def test_upload_document_success(self, mocker, mock_gemini_api_key):
-        """Test successful document upload."""
-        # Mock operation that's done with response containing document name
-        mock_response = MagicMock()
-        mock_response.document_name = "fileSearchStores/store-123/documents/doc-456"
-
-        mock_operation = MagicMock()
-        mock_operation.name = "operations/upload-123"
-        mock_operation.done = True
-        mock_operation.response = mock_response
+    def test_upload_document_existing_file(self, mock_genai_client, uploader, make_file):
+        """Test upload when file already exists."""
+        mock_file = make_file("files/existing-123", "existing.md")
+        mock_genai_client.files.list.return_value = [mock_file]
 
-        mock_client = MagicMock()
-        mock_client.file_search_stores.upload_to_file_search_store.return_value = mock_operation
-        mock_client.operations.get.return_value = mock_operation
-        mock_client.files.list.return_value = []  # No existing files
+        result = uploader.upload_document(
+            content="# Test Content",
+            display_name="existing.md",
+            store_name="stores/test-123",
+            check_existing=True,
+        )
 
-        mocker.patch.object(genai, "Client", return_value=mock_client)
+        # Should return existing file name without uploading
+        assert result == "files/existing-123"
+        mock_genai_client.file_search_stores.upload_to_file_search_store.assert_not_called()
+
+    def test_upload_document_known_file_fast_path(
+        self, mocker, mock_genai_client, uploader, make_file
+    ):
+        """Test that a name already in the file index returns before content is hashed."""
+        mock_genai_client.files.list.return_value = [make_file("files/existing-123", "a.md")]
+        uploader._check_existing_file("a.md")
+        prepare = mocker.spy(uploader, "_prepare_upload")
+
+        assert uploader.upload_document("# A", "a.md", "stores/test-123") == "files/existing-123"
+        assert (
+            asyncio.run(uploader.aupload_document("# A", "a.md", "stores/test-123"))
+            == "files/existing-123"
+        )
+        prepare.assert_not_called()
+        mock_genai_client.files.list.assert_called_once()
 
-        # Mock Path.unlink to avoid file system operations
-        mocker.patch.object(Path, "unlink")
+    def test_upload_document_not_yet_uploaded(
+        self, mock_genai_client, uploader, sample_mock_operation
+    ):
+        """Test that a document missing from the Files API is uploaded after the check."""
+        stores = mock_genai_client.file_search_stores
+        stores.upload_to_file_search_store.return_value = sample_mock_operation
 
-        uploader = GeminiUploader(api_key=mock_gemini_api_key)
         result = uploader.upload_document(
             content="# Test Content",
-            display_name="test.md",
+            display_name="new.md",
             store_name="stores/test-123",
-            check_existing=False,
+            check_existing=True,
         )
 
         assert result == "fileSearchStores/store-123/documents/doc-456"
-        mock_client.file_search_stores.upload_to_file_search_store.assert_called_once()
+        stores.upload_to_file_search_store.assert_called_once()
 
-    def test_upload_document_existing_file(self, mocker, mock_gemini_api_key):
-        """Test upload when file already exists."""
-        mock_file = MagicMock()
-        mock_file.name = "files/existing-123"
-        mock_file.display_name = "existing.md"
+        # The new upload is recorded for its store without listing again
+        assert uploader._check_existing_file("new.md", "stores/test-123") == result
+        assert uploader._check_existing_file("new.md", "stores/other-456") is None
+        mock_genai_client.files.list.assert_called_once()
 
-        mock_client = MagicMock()
-        mock_client.files.list.return_value = [mock_file]
+    def test_upload_document_same_name_other_store(
+        self, mock_genai_client, uploader, sample_mock_operation
+    ):
+        """Test that a name uploaded to one store is still uploaded to another store."""
+        stores = mock_genai_client.file_search_stores
+        stores.upload_to_file_search_store.return_value = sample_mock_operation
 
-        mocker.patch.object(genai, "Client", return_value=mock_client)
+        uploader.upload_document("# Version A", "test.md", "stores/store-a")
+        result = uploader.upload_document("# Version B", "test.md", "stores/store-b")
 
-        uploader = GeminiUploader(api_key=mock_gemini_api_key)
-        result = uploader.upload_document(
-            content="# Test Content",
-            display_name="existing.md",
-            store_name="stores/test-123",
-            check_existing=True,
+        assert result == "fileSearchStores/store-123/documents/doc-456"
+        assert stores.upload_to_file_search_store.call_count == 2
+
+    def test_upload_document_unchanged_content(
+        self, mocker, mock_genai_client, uploader, sample_mock_operation
+    ):
+        """Test that unchanged content short-circuits on its digest without a lookup."""
+        stores = mock_genai_client.file_search_stores
+        stores.upload_to_file_search_store.return_value = sample_mock_operation
+
+        first = uploader.upload_document("# Test Content", "test.md", "stores/test-123")
+        check_existing = mocker.spy(uploader, "_check_existing_file")
+        second = uploader.upload_document("# Test Content", "test.md", "stores/test-123")
+
+        assert first == second == "fileSearchStores/store-123/documents/doc-456"
+        check_existing.assert_not_called()
+        stores.upload_to_file_search_store.assert_called_once()
+
+    def test_upload_document_same_content_other_name(
+        self, mock_genai_client, uploader, sample_mock_operation
+    ):
+        """Test that identical content is uploaded under each display name it is given."""
+        stores = mock_genai_client.file_search_stores
+        stores.upload_to_file_search_store.return_value = sample_mock_operation
+
+        uploader.upload_document("# Test Content", "a.md", "stores/test-123")
+        uploader.upload_document("# Test Content", "b.md", "stores/test-123")
+
+        names = [
+            call.kwargs["config"]["display_name"]
+            for call in stores.upload_to_file_search_store.call_args_list
+        ]
+        assert names == ["a.md", "b.md"]
+
+    def test_upload_document_same_content_other_store(
+        self, mock_genai_client, uploader, sample_mock_operation
+    ):
+        """Test that identical content is uploaded again when bound for another store."""
+        stores = mock_genai_client.file_search_stores
+        stores.upload_to_file_search_store.return_value = sample_mock_operation
+
+        uploader.upload_document("# Test Content", "a.md", "stores/store-a")
+        uploader.upload_document("# Test Content", "a.md", "stores/store-b")
+        uploader.upload_document("# Test Content", "a.md", "stores/store-b")
+
+        assert stores.upload_to_file_search_store.call_count == 2
+        targets = [
+            call.kwargs["file_search_store_name"]
+            for call in stores.upload_to_file_search_store.call_args_list
+        ]
+        assert targets == ["stores/store-a", "stores/store-b"]
+
+    def test_upload_manifest(
+        self, tmp_path, mock_genai_client, mock_gemini_api_key, sample_mock_operation
+    ):
+        """Test that uploads recorded in the manifest are found by a later uploader."""
+        stores = mock_genai_client.file_search_stores
+        stores.upload_to_file_search_store.return_value = sample_mock_operation
+        manifest_path = tmp_path / "uploads.sqlite"
+
+        first = GeminiUploader(mock_gemini_api_key, manifest_path=manifest_path)
+        document_name = first.upload_document("# Test Content", "test.md", "stores/test-123")
+        mock_genai_client.files.list.reset_mock()
+
+        second = GeminiUploader(mock_gemini_api_key, manifest_path=manifest_path)
+
+        assert second._check_existing_file("test.md", "stores/test-123") == document_name
+        assert second.upload_document("# Test Content", "test.md", "stores/test-123") == (
+            document_name
+        )
+        mock_genai_client.files.list.assert_not_called()
+        stores.upload_to_file_search_store.assert_called_once()
+
+    def test_upload_manifest_per_store(
+        self, tmp_path, mock_genai_client, mock_gemini_api_key, sample_mock_operation
+    ):
+        """Test that an upload recorded for one store doesn't count for another store."""
+        stores = mock_genai_client.file_search_stores
+        stores.upload_to_file_search_store.return_value = sample_mock_operation
+        manifest_path = tmp_path / "uploads.sqlite"
+
+        GeminiUploader(mock_gemini_api_key, manifest_path=manifest_path).upload_document(
+            "# Test Content", "test.md", "stores/store-a"
         )
+        second = GeminiUploader(mock_gemini_api_key, manifest_path=manifest_path)
 
-        # Should return existing file name without uploading
-        assert result == "files/existing-123"
-        mock_client.file_search_stores.upload_to_file_search_store.assert_not_called()
-
-    def test_upload_document_wait_for_indexing(self, mocker, mock_gemini_api_key):
-        """Test that upload waits for indexing to complete."""
-        # Mock operations that transition from not done to done
-        mock_operation_pending = MagicMock()
-        mock_operation_pending.name = "operations/upload-123"
-        mock_operation_pending.done = False
-
-        mock_response = MagicMock()
-        mock_response.document_name = "fileSearchStores/store-123/documents/doc-456"
-
-        mock_operation_done = MagicMock()
-        mock_operation_done.name = "operations/upload-123"
-        mock_operation_done.done = True
-        mock_operation_done.response = mock_response
-
-        mock_client = MagicMock()
-        mock_client.file_search_stores.upload_to_file_search_store.return_value = (
-            mock_operation_pending
+        assert second._check_existing_file("test.md", "stores/store-b") is None
+        second.upload_document("# Test Content", "test.md", "stores/store-b")
+
+        assert stores.upload_to_file_search_store.call_count == 2
+        assert stores.upload_to_file_search_store.call_args[1]["file_search_store_name"] == (
+            "stores/store-b"
         )
-        # First call returns pending, second call returns done
-        mock_client.operations.get.side_effect = [
-            mock_operation_pending,
-            mock_operation_done,
-        ]
-        mock_client.files.list.return_value = []
 
-        mocker.patch.object(genai, "Client", return_value=mock_client)
-        mocker.patch.object(Path, "unlink")
+    def test_upload_manifest_changed_content(
+        self, tmp_path, mock_genai_client, mock_gemini_api_key, sample_mock_operation
+    ):
+        """Test that changed content replaces the document recorded for its display name."""
+        replacement = SimpleNamespace(
+            name="operations/upload-789",
+            done=True,
+            response=SimpleNamespace(document_name="fileSearchStores/store-123/documents/doc-789"),
+        )
+        stores = mock_genai_client.file_search_stores
+        stores.upload_to_file_search_store.side_effect = [sample_mock_operation, replacement]
+        manifest_path = tmp_path / "uploads.sqlite"
 
-        uploader = GeminiUploader(api_key=mock_gemini_api_key)
-        result = uploader.upload_document(
-            content="# Test Content",
-            display_name="test.md",
-            store_name="stores/test-123",
-            check_existing=False,
+        GeminiUploader(mock_gemini_api_key, manifest_path=manifest_path).upload_document(
+            "# Version A", "test.md", "stores/test-123"
         )
+        second = GeminiUploader(mock_gemini_api_key, manifest_path=manifest_path)
+        result = second.upload_document("# Version B", "test.md", "stores/test-123")
 
-        assert result == "fileSearchStores/store-123/documents/doc-456"
-        # Should have checked status twice (once pending, once done)
-        assert mock_client.operations.get.call_count == 2
-
-    def test_upload_document_exception(self, mocker, mock_gemini_api_key):
-        """Test handling of exception during upload."""
-        mock_client = MagicMock()
-        mock_client.file_search_stores.upload_to_file_search_store.side_effect = Exception(
-            "Upload failed"
+        assert result == "fileSearchStores/store-123/documents/doc-789"
+        assert stores.upload_to_file_search_store.call_count == 2
+        stores.documents.delete.assert_called_once_with(
+            name="fileSearchStores/store-123/documents/doc-456", config={"force": True}
         )
-        mock_client.files.list.return_value = []
 
-        mocker.patch.object(genai, "Client", return_value=mock_client)
-        mocker.patch.object(Path, "unlink")
+        # The manifest now describes the new content
+        third = GeminiUploader(mock_gemini_api_key, manifest_path=manifest_path)
+        assert third.upload_document("# Version B", "test.md", "stores/test-123") == result
+        assert stores.upload_to_file_search_store.call_count == 2
+
+    @pytest.mark.parametrize(
+        "content",
+        [b"# Test Content", io.BytesIO(b"# Test Content")],
+        ids=["bytes", "file"],
+    )
+    def test_upload_document_binary_content(
+        self, content, mock_genai_client, uploader, sample_mock_operation
+    ):
+        """Test uploading bytes or a binary file object, deduplicated like text."""
+        stores = mock_genai_client.file_search_stores
+        stores.upload_to_file_search_store.return_value = sample_mock_operation
+
+        first = uploader.upload_document("# Test Content", "test.md", "stores/test-123")
+        second = uploader.upload_document(content, "test.md", "stores/test-123")
+        uploader.upload_document(content, "test.md", "stores/test-123", check_existing=False)
+
+        assert first == second
+        uploaded = stores.upload_to_file_search_store.call_args[1]["file"]
+        assert uploaded.read() == b"# Test Content"
+        assert stores.upload_to_file_search_store.call_count == 2
+
+    def test_upload_document_file_mid_stream(
+        self, mock_genai_client, uploader, sample_mock_operation
+    ):
+        """Test that a file object is hashed and uploaded from its current position."""
+        stores = mock_genai_client.file_search_stores
+        stores.upload_to_file_search_store.return_value = sample_mock_operation
+        content = io.BytesIO(b"header\n# Test Content")
+        content.seek(len(b"header\n"))
+
+        uploader.upload_document(content, "test.md", "stores/test-123")
+        uploader.upload_document("# Test Content", "test.md", "stores/test-123")
+
+        uploaded = stores.upload_to_file_search_store.call_args[1]["file"]
+        assert uploaded.read() == b"# Test Content"
+        stores.upload_to_file_search_store.assert_called_once()
+
+    def test_upload_document_backoff(self, mocker, mock_genai_client, uploader):
+        """Test that status checks back off and give up instead of polling forever."""
+        pending = SimpleNamespace(name="operations/upload-123", done=False)
+        mock_genai_client.file_search_stores.upload_to_file_search_store.return_value = pending
+        mock_genai_client.operations.get.return_value = pending
+        mocker.patch("youtube_knowledge.uploader.MAX_INDEXING_POLLS", 5)
+        sleep = mocker.patch("time.sleep")
 
-        uploader = GeminiUploader(api_key=mock_gemini_api_key)
         result = uploader.upload_document(
             content="# Test Content",
             display_name="test.md",
@@ -243,140 +381,193 @@ class TestGeminiUploader:
         )
 
         assert result is None
+        assert mock_genai_client.operations.get.call_count == 5
+        delays = [call.args[0] for call in sleep.call_args_list]
+        assert delays == sorted(delays)
+        assert delays[0] < delays[-1]
+        # Each wait is the backoff delay plus at most POLL_JITTER of it
+        expected = POLL_INITIAL_DELAY
+        for delay in delays:
+            assert expected <= delay <= expected * (1 + POLL_JITTER)
+            expected = min(expected * POLL_BACKOFF, POLL_MAX_DELAY)
+
+    def test_upload_documents(self, mock_genai_client, uploader, make_file, sample_mock_operation):
+        """Test that a batch upload lists files once and keeps results in input order."""
+        mock_genai_client.files.list.return_value = [make_file("files/b-123", "b.md")]
+        stores = mock_genai_client.file_search_stores
+        stores.upload_to_file_search_store.return_value = sample_mock_operation
+
+        results = uploader.upload_documents(
+            [("# A", "a.md"), ("# B", "b.md"), ("# C", "c.md")], "stores/test-123"
+        )
 
-    def test_list_files(self, mocker, mock_gemini_api_key):
-        """Test listing all uploaded files."""
-        mock_file1 = MagicMock()
-        mock_file1.name = "files/file-123"
-        mock_file1.display_name = "test1.md"
+        document_name = "fileSearchStores/store-123/documents/doc-456"
+        assert results == [document_name, "files/b-123", document_name]
+        assert stores.upload_to_file_search_store.call_count == 2
+        mock_genai_client.files.list.assert_called_once()
+        assert uploader.upload_documents([], "stores/test-123") == []
+
+    def test_upload_documents_other_store(self, mock_genai_client, uploader, sample_mock_operation):
+        """Test that a batch upload isn't satisfied by uploads recorded for another store."""
+        stores = mock_genai_client.file_search_stores
+        stores.upload_to_file_search_store.return_value = sample_mock_operation
+        uploader.upload_document("# A", "a.md", "stores/store-a")
+        mock_genai_client.files.list.reset_mock()
+
+        uploader.upload_documents([("# A", "a.md"), ("# B", "b.md")], "stores/store-b")
 
-        mock_file2 = MagicMock()
-        mock_file2.name = "files/file-456"
-        mock_file2.display_name = "test2.md"
+        targets = [
+            call.kwargs["file_search_store_name"]
+            for call in stores.upload_to_file_search_store.call_args_list
+        ]
+        assert targets == ["stores/store-a", "stores/store-b", "stores/store-b"]
+        mock_genai_client.files.list.assert_not_called()
+
+    def test_aupload_document(self, mocker, mock_genai_client, uploader, sample_mock_operation):
+        """Test the async upload, awaiting indexing status checks on the async client."""
+        pending = SimpleNamespace(name="operations/upload-123", done=False)
+        aio = mock_genai_client.aio
+        upload = mocker.patch.object(
+            aio.file_search_stores,
+            "upload_to_file_search_store",
+            mocker.AsyncMock(return_value=pending),
+        )
+        get = mocker.patch.object(
+            aio.operations, "get", mocker.AsyncMock(side_effect=[pending, sample_mock_operation])
+        )
+        sleep = mocker.patch("asyncio.sleep", mocker.AsyncMock())
+
+        first = asyncio.run(uploader.aupload_document("# Test", "test.md", "stores/test-123"))
+        second = asyncio.run(uploader.aupload_document("# Test", "test.md", "stores/test-123"))
+
+        assert first == second == "fileSearchStores/store-123/documents/doc-456"
+        upload.assert_awaited_once()
+        assert get.await_count == 2
+        assert sleep.await_count == 2
+        mock_genai_client.operations.get.assert_not_called()
+
+    def test_aupload_documents(
+        self, mocker, mock_genai_client, uploader, make_file, sample_mock_operation
+    ):
+        """Test that an async batch upload lists files once and keeps results in input order."""
+        mock_genai_client.files.list.return_value = [make_file("files/b-123", "b.md")]
+        upload = mocker.patch.object(
+            mock_genai_client.aio.file_search_stores,
+            "upload_to_file_search_store",
+            mocker.AsyncMock(return_value=sample_mock_operation),
+        )
 
-        mock_client = MagicMock()
-        mock_client.files.list.return_value = [mock_file1, mock_file2]
+        results = asyncio.run(
+            uploader.aupload_documents(
+                [("# A", "a.md"), ("# B", "b.md"), ("# C", "c.md")], "stores/test-123"
+            )
+        )
 
-        mocker.patch.object(genai, "Client", return_value=mock_client)
+        document_name = "fileSearchStores/store-123/documents/doc-456"
+        assert results == [document_name, "files/b-123", document_name]
+        assert upload.await_count == 2
+        mock_genai_client.files.list.assert_called_once()
+
+    def test_list_files(self, mock_genai_client, uploader, make_file):
+        """Test listing all uploaded files."""
+        mock_file1 = make_file("files/file-123", "test1.md")
+        mock_file2 = make_file("files/file-456", "test2.md")
+
+        mock_genai_client.files.list.return_value = [mock_file1, mock_file2]
 
-        uploader = GeminiUploader(api_key=mock_gemini_api_key)
         files = uploader.list_files()
 
         assert len(files) == 2
         assert files[0] == ("files/file-123", "test1.md")
         assert files[1] == ("files/file-456", "test2.md")
 
-    def test_list_files_exception(self, mocker, mock_gemini_api_key):
+    def test_list_files_exception(self, mock_genai_client, uploader):
         """Test handling of exception when listing files."""
-        mock_client = MagicMock()
-        mock_client.files.list.side_effect = Exception("List error")
+        mock_genai_client.files.list.side_effect = Exception("List error")
 
-        mocker.patch.object(genai, "Client", return_value=mock_client)
-
-        uploader = GeminiUploader(api_key=mock_gemini_api_key)
         files = uploader.list_files()
 
         assert files == []
 
-    def test_get_file_search_stores(self, mocker, mock_gemini_api_key):
+    def test_get_file_search_stores(self, mock_genai_client, uploader):
         """Test listing all file search stores."""
-        mock_store1 = MagicMock()
-        mock_store1.name = "stores/store-123"
-        mock_store1.display_name = "Store 1"
+        mock_store1 = SimpleNamespace(name="stores/store-123", display_name="Store 1")
 
-        mock_store2 = MagicMock()
-        mock_store2.name = "stores/store-456"
-        mock_store2.display_name = "Store 2"
+        mock_store2 = SimpleNamespace(name="stores/store-456", display_name="Store 2")
 
-        mock_client = MagicMock()
-        mock_client.file_search_stores.list.return_value = [mock_store1, mock_store2]
+        mock_genai_client.file_search_stores.list.return_value = [mock_store1, mock_store2]
 
-        mocker.patch.object(genai, "Client", return_value=mock_client)
-
-        uploader = GeminiUploader(api_key=mock_gemini_api_key)
         stores = uploader.get_file_search_stores()
 
         assert len(stores) == 2
         assert stores[0] == ("stores/store-123", "Store 1")
         assert stores[1] == ("stores/store-456", "Store 2")
 
-    def test_get_file_search_stores_exception(self, mocker, mock_gemini_api_key):
+    def test_get_file_search_stores_exception(self, mock_genai_client, uploader):
         """Test handling of exception when listing stores."""
-        mock_client = MagicMock()
-        mock_client.file_search_stores.list.side_effect = Exception("List error")
-
-        mocker.patch.object(genai, "Client", return_value=mock_client)
+        mock_genai_client.file_search_stores.list.side_effect = Exception("List error")
 
-        uploader = GeminiUploader(api_key=mock_gemini_api_key)
         stores = uploader.get_file_search_stores()
 
         assert stores == []
 
-    def test_upload_document_creates_temp_file(self, mocker, mock_gemini_api_key):
-        """Test that upload creates a temporary file with correct content."""
-        mock_operation = MagicMock()
-        mock_operation.name = "operations/upload-123"
-        mock_operation.done = True
-
-        mock_client = MagicMock()
-        mock_client.file_search_stores.upload_to_file_search_store.return_value = mock_operation
-        mock_client.operations.get.return_value = mock_operation
-        mock_client.files.list.return_value = []
-
-        mocker.patch.object(genai, "Client", return_value=mock_client)
-
-        # Track temporary file creation
-        original_tempfile = tempfile.NamedTemporaryFile
-        temp_files_created = []
+    @pytest.mark.parametrize(
+        "scenario", ["success", "pending_then_done", "exception", "in_memory", "chunking"]
+    )
+    def test_upload_document(
+        self, mocker, scenario, mock_genai_client, uploader, sample_mock_operation
+    ):
+        """Test upload_document across its success, polling and failure paths."""
+        stores = mock_genai_client.file_search_stores
+        stores.upload_to_file_search_store.return_value = sample_mock_operation
+        mock_genai_client.operations.get.return_value = sample_mock_operation
+
+        # Skip the waits between indexing status checks
+        mocker.patch("time.sleep")
+
+        def pending_then_done():
+            # First status check returns pending, second returns done
+            pending = SimpleNamespace(name="operations/upload-123", done=False)
+            stores.upload_to_file_search_store.return_value = pending
+            mock_genai_client.operations.get.side_effect = [pending, sample_mock_operation]
+
+        def exception():
+            stores.upload_to_file_search_store.side_effect = Exception("Upload failed")
+
+        configure = {
+            "pending_then_done": pending_then_done,
+            "exception": exception,
+        }
+        if scenario in configure:
+            configure[scenario]()
+        mock_tempfile = mocker.spy(tempfile, "NamedTemporaryFile")
 
-        def track_tempfile(*args, **kwargs):
-            temp_file = original_tempfile(*args, **kwargs)
-            temp_files_created.append(temp_file.name)
-            return temp_file
-
-        mocker.patch("tempfile.NamedTemporaryFile", side_effect=track_tempfile)
-        mock_unlink = mocker.patch.object(Path, "unlink")
-
-        uploader = GeminiUploader(api_key=mock_gemini_api_key)
-        uploader.upload_document(
+        result = uploader.upload_document(
             content="# Test Content\n\nThis is a test.",
             display_name="test.md",
             store_name="stores/test-123",
             check_existing=False,
         )
 
-        # Verify temp file was created and cleaned up
-        assert len(temp_files_created) == 1
-        mock_unlink.assert_called_once()
-
-    def test_upload_document_chunking_config(self, mocker, mock_gemini_api_key):
-        """Test that upload includes correct chunking configuration."""
-        mock_operation = MagicMock()
-        mock_operation.name = "operations/upload-123"
-        mock_operation.done = True
-
-        mock_client = MagicMock()
-        mock_client.file_search_stores.upload_to_file_search_store.return_value = mock_operation
-        mock_client.operations.get.return_value = mock_operation
-        mock_client.files.list.return_value = []
-
-        mocker.patch.object(genai, "Client", return_value=mock_client)
-        mocker.patch.object(Path, "unlink")
+        if scenario == "exception":
+            assert result is None
+            return
 
-        uploader = GeminiUploader(api_key=mock_gemini_api_key)
-        uploader.upload_document(
-            content="# Test Content",
-            display_name="test.md",
-            store_name="stores/test-123",
-            check_existing=False,
-        )
-
-        # Get the config that was passed to upload
-        call_kwargs = mock_client.file_search_stores.upload_to_file_search_store.call_args[1]
-        config = call_kwargs["config"]
-
-        assert config["display_name"] == "test.md"
-        assert "chunking_config" in config
-        assert "white_space_config" in config["chunking_config"]
-        assert config["chunking_config"]["white_space_config"]["max_tokens_per_chunk"] == 500
-        assert config["chunking_config"]["white_space_config"]["max_overlap_tokens"] == 50
+        assert result == "fileSearchStores/store-123/documents/doc-456"
+        stores.upload_to_file_search_store.assert_called_once()
+
+        if scenario == "pending_then_done":
+            assert mock_genai_client.operations.get.call_count >= 2
+        elif scenario == "in_memory":
+            # Content is streamed from memory, never written to a temp file
+            uploaded = stores.upload_to_file_search_store.call_args[1]["file"]
+            assert isinstance(uploaded, io.BytesIO)
+            assert uploaded.getvalue() == b"# Test Content\n\nThis is a test."
+            mock_tempfile.assert_not_called()
+        elif scenario == "chunking":
+            config = stores.upload_to_file_search_store.call_args[1]["config"]
+            white_space_config = config["chunking_config"]["white_space_config"]
+
+            assert config["display_name"] == "test.md"
+            assert white_space_config["max_tokens_per_chunk"] == 500
+            assert white_space_config["max_overlap_tokens"] == 50
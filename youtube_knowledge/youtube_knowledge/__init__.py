@@ -1,19 +1,53 @@
 """YouTube to Gemini Knowledge Base - Transform YouTube playlists into searchable knowledge bases."""
 
+import importlib
+from typing import TYPE_CHECKING
+
+
 __version__ = "0.1.0"
 
-from .chat import KnowledgeBaseChat
-from .models import (
-    PlaylistState,
-    ProcessedVideo,
-    TranscriptEntry,
-    VideoInfo,
-)
-from .playlist import PlaylistFetcher
-from .state import StateManager
-from .transcript import TranscriptRetriever
-from .transform import TranscriptTransformer
-from .uploader import GeminiUploader
+if TYPE_CHECKING:
+    from .chat import KnowledgeBaseChat
+    from .models import (
+        PlaylistState,
+        ProcessedVideo,
+        TranscriptEntry,
+        VideoInfo,
+    )
+    from .playlist import PlaylistFetcher
+    from .state import StateManager
+    from .transcript import TranscriptRetriever
+    from .transform import TranscriptTransformer
+    from .uploader import GeminiUploader
+
+# Public name -> submodule defining it. Submodules (and the SDKs they pull in)
+# are only imported on first access, so e.g. the CLI's playlist commands don't
+# pay for google-genai or rich.
+_LAZY = {
+    "GeminiUploader": ".uploader",
+    "KnowledgeBaseChat": ".chat",
+    "PlaylistFetcher": ".playlist",
+    "PlaylistState": ".models",
+    "ProcessedVideo": ".models",
+    "StateManager": ".state",
+    "TranscriptEntry": ".models",
+    "TranscriptRetriever": ".transcript",
+    "TranscriptTransformer": ".transform",
+    "VideoInfo": ".models",
+}
+
+
+def __getattr__(name: str):
+    """Import a public class from its submodule on first access (PEP 562)."""
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted([*globals(), *_LAZY])
 
 
 __all__ = [
@@ -0,0 +1,35 @@
+"""Shared Gemini client construction."""
+
+from functools import lru_cache
+
+import httpx
+from google import genai
+from google.genai import types
+
+
+# Keep idle connections long enough to outlast the waits between indexing
+# status checks (httpx drops them after 5 seconds by default), and enough of
+# them for the pipeline's concurrent transforms and uploads
+_CONNECTION_LIMITS = httpx.Limits(max_keepalive_connections=32, keepalive_expiry=60)
+
+
+@lru_cache(maxsize=4)
+def get_client(api_key: str) -> genai.Client:
+    """Get the Gemini client for an API key, creating it on first use.
+
+    The transformer, uploader and chat all share one client (and its HTTP
+    connection pool) per API key instead of each building their own.
+
+    Args:
+        api_key: Google Gemini API key
+
+    Returns:
+        Gemini client for the key
+    """
+    return genai.Client(
+        api_key=api_key,
+        http_options=types.HttpOptions(
+            client_args={"limits": _CONNECTION_LIMITS},
+            async_client_args={"limits": _CONNECTION_LIMITS},
+        ),
+    )
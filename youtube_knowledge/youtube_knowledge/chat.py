@@ -1,75 +1,249 @@
 """Chat interface using Gemini with file search."""
 
-from google import genai
+import contextlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+
 from google.genai import types
-from rich.console import Console
-from rich.markdown import Markdown
-from rich.panel import Panel
+
+from ._client import get_client
 
 
 class KnowledgeBaseChat:
     """Interactive chat interface for querying the knowledge base."""
 
-    def __init__(self, api_key: str, model: str = "gemini-2.5-flash"):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gemini-2.5-flash",
+        cache_size: int = 128,
+        cache_ttl_seconds: float = 3600,
+    ):
         """Initialize the chat interface.
 
         Args:
             api_key: Google Gemini API key
             model: Gemini model to use (must be gemini-2.5-flash or gemini-2.5-pro for file_search)
+            cache_size: Maximum number of answers kept in the response cache
+            cache_ttl_seconds: How long a cached answer stays valid
         """
-        self.client = genai.Client(api_key=api_key)
+        # rich is imported on first use so importing the package stays cheap
+        from rich.console import Console
+
+        self.client = get_client(api_key)
         self.model = model
         self.console = Console()
+        # Markdown rendering is skipped when output is piped or redirected
+        self._is_tty = sys.stdout.isatty()
+        self.cache_size = cache_size
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self._cache: OrderedDict[
+            tuple[str, str], tuple[float, str, types.GenerateContentResponse | None]
+        ] = OrderedDict()
+        # Request config per file search store, built once and reused for every question
+        self._config_cache: dict[str, types.GenerateContentConfig] = {}
 
     def query(
         self,
         question: str,
         file_search_store_name: str,
         show_sources: bool = True,
+        no_cache: bool = False,
     ) -> str | None:
         """Query the knowledge base.
 
+        The answer is streamed to the console as it arrives. Repeated
+        questions against the same store are answered from an in-memory
+        cache until the cached answer expires.
+
         Args:
             question: User's question
             file_search_store_name: File search store resource name
             show_sources: Whether to display source information
+            no_cache: Skip the response cache and always ask Gemini
 
         Returns:
             Response text, or None on error
         """
         try:
-            # Query with file search
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=question,
-                config=types.GenerateContentConfig(
-                    tools=[
-                        types.Tool(
-                            file_search=types.FileSearch(
-                                file_search_store_names=[file_search_store_name]
-                            )
-                        )
-                    ]
-                ),
-            )
-
-            if not response or not response.text:
-                return None
+            key = (question, file_search_store_name)
+            cached = None if no_cache else self._get_cached_response(key)
 
             # Display response
             self.console.print("\n")
-            self.console.print(Markdown(response.text))
+            if cached:
+                text, response = cached
+                if self._is_tty:
+                    from rich.markdown import Markdown
+
+                    self.console.print(Markdown(text))
+                else:
+                    print(text)
+            else:
+                # Query with file search
+                text, response = self._stream_answer(question, file_search_store_name)
+
+                if not text:
+                    return None
+
+                self._cache_response(key, text, response)
 
             # Display sources if requested
-            if show_sources and response.candidates:
+            if show_sources and response and response.candidates:
                 self._display_sources(response)
 
-            return response.text
+            return text
 
         except Exception as e:
             self.console.print(f"\n❌ Error querying knowledge base: {e!s}", style="red")
             return None
 
+    def _stream_answer(
+        self, question: str, file_search_store_name: str
+    ) -> tuple[str, types.GenerateContentResponse | None]:
+        """Stream an answer to the console, rendering it as Markdown as it arrives.
+
+        When stdout is not a terminal the raw text is printed instead.
+
+        Args:
+            question: User's question
+            file_search_store_name: File search store resource name
+
+        Returns:
+            Full answer text, and the last response chunk (which carries the
+            grounding metadata)
+        """
+        chunks = []
+        response = None
+        if not self._is_tty:
+            for response in self._generate_stream(question, file_search_store_name):
+                if response.text:
+                    chunks.append(response.text)
+                    print(response.text, end="", flush=True)
+            print()
+            return "".join(chunks), response
+
+        from rich.live import Live
+        from rich.markdown import Markdown
+
+        with Live(Markdown(""), console=self.console, vertical_overflow="visible") as live:
+            for response in self._generate_stream(question, file_search_store_name):
+                if response.text:
+                    chunks.append(response.text)
+                    live.update(Markdown("".join(chunks)))
+        return "".join(chunks), response
+
+    def _generate_stream(
+        self, question: str, file_search_store_name: str
+    ) -> Iterator[types.GenerateContentResponse]:
+        """Ask Gemini a question with file search over the given store.
+
+        Args:
+            question: User's question
+            file_search_store_name: File search store resource name
+
+        Returns:
+            Iterator over the streamed response chunks
+        """
+        return self.client.models.generate_content_stream(
+            model=self.model,
+            contents=question,
+            config=self._generation_config(file_search_store_name),
+        )
+
+    def _generation_config(self, file_search_store_name: str) -> types.GenerateContentConfig:
+        """Get the request config for a store, building it on first use.
+
+        Args:
+            file_search_store_name: File search store resource name
+
+        Returns:
+            Config carrying the store's file_search tool
+        """
+        config = self._config_cache.get(file_search_store_name)
+        if config is None:
+            config = types.GenerateContentConfig(
+                tools=[self._file_search_tool(file_search_store_name)]
+            )
+            self._config_cache[file_search_store_name] = config
+        return config
+
+    def _warm_up(self, file_search_store_name: str):
+        """Build the store's request config and open the connection to Gemini.
+
+        Looking up the store is a cheap request that leaves a warm TLS
+        connection for the first question.
+
+        Args:
+            file_search_store_name: File search store resource name
+        """
+        self._generation_config(file_search_store_name)
+        # The question itself reports any connection or store problem
+        with contextlib.suppress(Exception):
+            self.client.file_search_stores.get(name=file_search_store_name)
+
+    @staticmethod
+    def _file_search_tool(file_search_store_name: str) -> types.Tool:
+        """Build the file_search tool for a store.
+
+        Args:
+            file_search_store_name: File search store resource name
+
+        Returns:
+            File search tool
+        """
+        return types.Tool(
+            file_search=types.FileSearch(file_search_store_names=[file_search_store_name])
+        )
+
+    def cache_clear(self):
+        """Forget every cached answer."""
+        self._cache.clear()
+
+    def _get_cached_response(
+        self, key: tuple[str, str]
+    ) -> tuple[str, types.GenerateContentResponse | None] | None:
+        """Look up a cached answer, dropping it if it has expired.
+
+        Args:
+            key: (question, file search store name) pair
+
+        Returns:
+            Cached (answer text, last response chunk), or None if missing or expired
+        """
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+
+        cached_at, text, response = entry
+        if time.monotonic() - cached_at >= self.cache_ttl_seconds:
+            del self._cache[key]
+            return None
+
+        self._cache.move_to_end(key)
+        return text, response
+
+    def _cache_response(
+        self,
+        key: tuple[str, str],
+        text: str,
+        response: types.GenerateContentResponse | None,
+    ):
+        """Store an answer, evicting the least recently used one when full.
+
+        Args:
+            key: (question, file search store name) pair
+            text: Full answer text
+            response: Last response chunk, kept for its grounding metadata
+        """
+        self._cache[key] = (time.monotonic(), text, response)
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
     def interactive_chat(self, file_search_store_name: str, playlist_title: str | None = None):
         """Start an interactive chat session.
 
@@ -77,6 +251,8 @@ class KnowledgeBaseChat:
             file_search_store_name: File search store resource name
             playlist_title: Optional playlist title for display
         """
+        from rich.panel import Panel
+
         title = (
             f"Knowledge Base Chat: {playlist_title}" if playlist_title else "Knowledge Base Chat"
         )
@@ -84,12 +260,19 @@ class KnowledgeBaseChat:
         self.console.print(
             Panel(
                 "[bold cyan]Ask questions about the videos in the knowledge base[/]\n"
-                "[dim]Type 'exit', 'quit', or 'q' to end the session[/]",
+                "[dim]Type '/clear' to forget cached answers, "
+                "or 'exit', 'quit', or 'q' to end the session[/]",
                 title=title,
                 border_style="cyan",
             )
         )
 
+        # Open a warm connection while the user is still typing their first question
+        warm_up = threading.Thread(
+            target=self._warm_up, args=(file_search_store_name,), daemon=True
+        )
+        warm_up.start()
+
         while True:
             try:
                 # Get user input
@@ -104,7 +287,13 @@ class KnowledgeBaseChat:
                     self.console.print("\n[dim]Goodbye![/]")
                     break
 
+                if question == "/clear":
+                    self.cache_clear()
+                    self.console.print("[dim]Cleared cached answers.[/]")
+                    continue
+
                 # Query the knowledge base
+                warm_up.join()
                 self.console.print("\n[bold green]Assistant:[/]")
                 self.query(question, file_search_store_name)
 
@@ -121,26 +310,31 @@ class KnowledgeBaseChat:
             response: Gemini API response
         """
         try:
-            candidate = response.candidates[0]
-
-            if hasattr(candidate, "grounding_metadata") and candidate.grounding_metadata:
-                grounding = candidate.grounding_metadata
-
-                # Display retrieval queries if available
-                if hasattr(grounding, "retrieval_queries") and grounding.retrieval_queries:
-                    self.console.print("\n[dim]📚 Retrieved from:[/]")
-                    for query in grounding.retrieval_queries:
-                        self.console.print(f"  [dim]• {query}[/]")
-
-                # Display grounding chunks if available
-                if hasattr(grounding, "grounding_chunks") and grounding.grounding_chunks:
-                    self.console.print("\n[dim]📄 Sources:[/]")
-                    for i, chunk in enumerate(grounding.grounding_chunks[:3], 1):  # Show top 3
-                        if hasattr(chunk, "retrieved_context"):
-                            context = chunk.retrieved_context
-                            if hasattr(context, "title"):
-                                self.console.print(f"  [dim]{i}. {context.title}[/]")
-
-        except Exception:
-            # Silently ignore source display errors
+            grounding = getattr(response.candidates[0], "grounding_metadata", None)
+            if grounding is None:
+                return
+
+            lines = []
+
+            # Display retrieval queries if available
+            if queries := getattr(grounding, "retrieval_queries", None):
+                lines.append("\n[dim]📚 Retrieved from:[/]")
+                lines.extend(f"  [dim]• {query}[/]" for query in queries)
+
+            # Display grounding chunk titles if available (top 3)
+            titles = [
+                getattr(getattr(chunk, "retrieved_context", None), "title", None)
+                for chunk in (getattr(grounding, "grounding_chunks", None) or [])[:3]
+            ]
+            if titles:
+                lines.append("\n[dim]📄 Sources:[/]")
+                lines.extend(
+                    f"  [dim]{i}. {title}[/]" for i, title in enumerate(titles, 1) if title
+                )
+
+            if lines:
+                self.console.print("\n".join(lines))
+
+        except AttributeError:
+            # Ignore responses that don't have the expected shape
             pass
@@ -1,10 +1,22 @@
 """Command-line interface for YouTube Knowledge Base."""
 
+import asyncio
+import functools
+import hashlib
+import logging
 import os
 import sys
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
 
 import click
+import requests
+from requests.adapters import HTTPAdapter
 from rich.console import Console
+from rich.logging import RichHandler
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.table import Table
 
@@ -19,9 +31,21 @@ from .uploader import GeminiUploader
 
 console = Console()
 
+# Workers per pipeline stage, sized to what each API tolerates
+FETCH_WORKERS = 8
+TRANSFORM_WORKERS = 4
+UPLOAD_WORKERS = 8
 
+# Items buffered between pipeline stages
+STAGE_QUEUE_SIZE = 8
+
+# Record of uploaded documents, kept alongside the playlist state
+UPLOAD_MANIFEST_PATH = Path(".state/uploads.sqlite")
+
+
+@functools.cache
 def get_api_key() -> str:
-    """Get Gemini API key from environment."""
+    """Get Gemini API key from environment (read once per process)."""
     api_key = os.environ.get("GOOGLE_API_KEY") or os.environ.get("GEMINI_API_KEY")
     if not api_key:
         console.print(
@@ -31,68 +55,179 @@ def get_api_key() -> str:
     return api_key
 
 
-def _process_single_video(
-    video,
-    state: StateManager,
-    state_obj,
-    transcript_retriever: TranscriptRetriever,
-    transformer: TranscriptTransformer,
-    uploader: GeminiUploader,
-    file_search_store: str,
-) -> tuple[bool, str]:
-    """Process a single video and return (success, status).
+def _http_session(pool_size: int) -> requests.Session:
+    """Create an HTTP session whose connection pool fits pool_size concurrent requests."""
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size))
+    return session
 
-    Returns:
-        Tuple of (success: bool, status: str) where status is "processed", "failed", or "skipped"
+
+class _VideoPipeline:
+    """Processes videos through transcript fetch -> transform -> upload stages.
+
+    The stages are connected by bounded queues and each has its own pool of
+    workers, so one video's transcript fetch overlaps another's transform and
+    a third's upload. Blocking calls run in worker threads and the transform
+    uses the async Gemini client. A video that fails at any stage is recorded
+    as failed and leaves the pipeline. State is only touched from the event loop.
     """
-    # Get transcript
-    transcript = transcript_retriever.get_transcript(video.video_id)
-    if not transcript:
-        error = "Failed to retrieve transcript"
-        state_obj.add_failed(video.video_id, error)
-        state.save(state_obj)
-        return False, "failed"
-
-    # Format transcript
-    formatted_transcript = transcript_retriever.format_transcript(transcript)
-    console.print(f"  📝 Retrieved transcript ({len(transcript)} segments)")
-
-    # Transform transcript
-    transformed = transformer.transform(video, transcript, formatted_transcript)
-    if not transformed:
-        error = "Failed to transform transcript"
-        state_obj.add_failed(video.video_id, error)
-        state.save(state_obj)
-        return False, "failed"
-
-    console.print(f"  🤖 Transformed transcript ({len(transformed)} chars)")
-
-    # Upload to Gemini
-    display_name = f"youtube-{video.video_id}"
-    file_name = uploader.upload_document(
-        content=transformed,
-        display_name=display_name,
-        store_name=file_search_store,
-    )
 
-    if file_name:
-        # Record success
+    def __init__(
+        self,
+        *,
+        state_manager: StateManager,
+        state,
+        transcript_retriever: TranscriptRetriever,
+        transformer: TranscriptTransformer,
+        uploader: GeminiUploader,
+        file_search_store: str,
+        on_done: Callable[[object, str], None],
+    ):
+        """Initialize the pipeline.
+
+        Args:
+            state_manager: Records each video's outcome
+            state: PlaylistState of the playlist being processed
+            transcript_retriever: Fetches transcripts
+            transformer: Transforms transcripts with Gemini
+            uploader: Uploads transformed documents
+            file_search_store: File search store resource name
+            on_done: Called with each video and its status ("processed" or "failed")
+        """
+        self.state_manager = state_manager
+        self.state = state
+        self.transcript_retriever = transcript_retriever
+        self.transformer = transformer
+        self.uploader = uploader
+        self.file_search_store = file_search_store
+        self.on_done = on_done
+
+    async def run(self, videos: list):
+        """Process videos until every one has been processed or has failed.
+
+        Args:
+            videos: VideoInfo objects to process
+        """
+        # Fetch workers, and upload workers looking up existing files, block a thread
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=FETCH_WORKERS + UPLOAD_WORKERS)
+        )
+
+        pending = asyncio.Queue()
+        for video in [*videos, None]:
+            pending.put_nowait(video)
+        transcripts = asyncio.Queue(maxsize=STAGE_QUEUE_SIZE)
+        transformed = asyncio.Queue(maxsize=STAGE_QUEUE_SIZE)
+
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(self._run_stage(self._fetch, pending, transcripts, FETCH_WORKERS))
+            tg.create_task(
+                self._run_stage(self._transform, transcripts, transformed, TRANSFORM_WORKERS)
+            )
+            tg.create_task(self._run_stage(self._upload, transformed, None, UPLOAD_WORKERS))
+
+    @staticmethod
+    async def _run_stage(
+        handle: Callable[[Any], Awaitable[tuple | None]],
+        inbox: asyncio.Queue,
+        outbox: asyncio.Queue | None,
+        workers: int,
+    ):
+        """Run workers that pass inbox items through handle until inbox ends with None.
+
+        Args:
+            handle: Processes one item, returning the next stage's item or None
+            inbox: Items for this stage, terminated by None
+            outbox: Queue for the next stage's items (None for the last stage)
+            workers: Number of items handled at once
+        """
+
+        async def worker():
+            while (item := await inbox.get()) is not None:
+                result = await handle(item)
+                if result is not None and outbox is not None:
+                    await outbox.put(result)
+            # Pass the end marker on to this stage's other workers
+            inbox.put_nowait(None)
+
+        async with asyncio.TaskGroup() as tg:
+            for _ in range(workers):
+                tg.create_task(worker())
+        if outbox is not None:
+            await outbox.put(None)
+
+    def _fail(self, video, error: str) -> None:
+        """Record a video as failed."""
+        self.state_manager.record_failed(self.state, video.video_id, error)
+        self.on_done(video, "failed")
+
+    async def _fetch(self, video) -> tuple | None:
+        """Fetch and format a video's transcript.
+
+        Returns:
+            (video, transcript, formatted transcript), or None if the video failed
+        """
+        console.print(f"\n[bold]Processing:[/] {video.title}")
+        result = await asyncio.to_thread(
+            self.transcript_retriever.get_transcript_and_format, video.video_id
+        )
+        if not result or not result[0]:
+            self._fail(video, "Failed to retrieve transcript")
+            return None
+
+        transcript, formatted_transcript = result
+        console.print(f"  📝 Retrieved transcript ({len(transcript)} segments)")
+        return video, transcript, formatted_transcript
+
+    async def _transform(self, item: tuple) -> tuple | None:
+        """Transform a fetched transcript with Gemini.
+
+        Returns:
+            (video, formatted transcript, transformed content), or None if the video failed
+        """
+        video, transcript, formatted_transcript = item
+        transformed = await self.transformer.atransform(video, transcript, formatted_transcript)
+        if not transformed:
+            self._fail(video, "Failed to transform transcript")
+            return None
+
+        console.print(f"  🤖 Transformed transcript ({len(transformed)} chars)")
+        return video, formatted_transcript, transformed
+
+    async def _upload(self, item: tuple) -> None:
+        """Upload transformed content and record the video as processed."""
+        video, formatted_transcript, transformed = item
+        content_hash = hashlib.blake2b(transformed.encode(), digest_size=16).hexdigest()
+        previous = self.state.processed_videos.get(video.video_id)
+        uploaded_before = previous is not None and not previous.error
+        if uploaded_before and previous.content_hash == content_hash:
+            # Reprocessing produced the content that is already uploaded
+            self.on_done(video, "skipped")
+            return
+
+        # Changed content must be uploaded, not matched to the stale document by
+        # name, so the recorded content_hash is always the content in the store
+        display_name = f"youtube-{video.video_id}"
+        file_name = await self.uploader.aupload_document(
+            content=transformed,
+            display_name=display_name,
+            store_name=self.file_search_store,
+            check_existing=not uploaded_before,
+        )
+        if not file_name:
+            self._fail(video, "Failed to upload to Gemini")
+            return
+
         processed_video = ProcessedVideo.create(
             video_id=video.video_id,
             title=video.title,
             gemini_file_name=display_name,
             transcript_length=len(formatted_transcript),
             transformed_length=len(transformed),
+            content_hash=content_hash,
         )
-        state_obj.add_processed(processed_video)
-        state.save(state_obj)
-        return True, "processed"
-
-    # Record failure
-    error = "Failed to upload to Gemini"
-    state_obj.add_failed(video.video_id, error)
-    state.save(state_obj)
-    return False, "failed"
+        self.state_manager.record_processed(self.state, processed_video)
+        self.on_done(video, "processed")
 
 
 def _print_summary(processed_count: int, skipped_count: int, failed_count: int, playlist_id: str):
@@ -111,7 +246,15 @@ def _print_summary(processed_count: int, skipped_count: int, failed_count: int,
 @click.version_option(version="0.1.0")
 def main():
     """Transform YouTube playlists into Gemini knowledge bases."""
-    pass
+    # Show the package's log messages through the console, so they print
+    # cleanly above a running progress display
+    package_logger = logging.getLogger("youtube_knowledge")
+    if not package_logger.handlers:
+        package_logger.addHandler(
+            RichHandler(console=console, show_time=False, show_level=False, show_path=False)
+        )
+        package_logger.setLevel(logging.INFO)
+        package_logger.propagate = False
 
 
 @main.command()
@@ -145,24 +288,36 @@ def process(playlist_id: str, store_name: str, skip_existing: bool, languages: s
     """
     api_key = get_api_key()
 
-    # Initialize components
+    # Initialize components. Transcript fetches share one keep-alive session;
+    # the transformer and uploader already share one Gemini client per API key.
+    http_session = _http_session(FETCH_WORKERS)
     state_manager = StateManager()
     playlist_fetcher = PlaylistFetcher()
-    transcript_retriever = TranscriptRetriever(languages=languages.split(","))
+    transcript_retriever = TranscriptRetriever(
+        languages=languages.split(","), http_client=http_session
+    )
     transformer = TranscriptTransformer(api_key=api_key)
-    uploader = GeminiUploader(api_key=api_key)
+    uploader = GeminiUploader(api_key=api_key, manifest_path=UPLOAD_MANIFEST_PATH)
 
     try:
-        # Fetch playlist videos
+        # Fetch playlist videos, leaving out ones processed in an earlier run
+        state = state_manager.load(playlist_id)
+        skip_ids = state.processed_ids() if skip_existing and state else None
+
         console.print(f"\n[bold cyan]Fetching playlist: {playlist_id}[/]")
-        videos = playlist_fetcher.fetch_videos(playlist_id)
+        playlist_title, videos, skipped = playlist_fetcher.fetch_playlist(playlist_id, skip_ids)
+        counts = Counter(skipped=skipped)
 
-        if not videos:
+        if not videos and not counts["skipped"]:
             console.print("[red]No videos found in playlist[/]")
             return
 
-        playlist_title = playlist_fetcher.get_playlist_title(playlist_id) or playlist_id
-        console.print(f"[green]Found {len(videos)} videos in '{playlist_title}'[/]\n")
+        playlist_title = playlist_title or playlist_id
+        total = len(videos) + counts["skipped"]
+        console.print(f"[green]Found {total} videos in '{playlist_title}'[/]")
+        if counts["skipped"]:
+            console.print(f"  ⏭️  Skipping {counts['skipped']} already processed videos")
+        console.print()
 
         # Determine store name
         if not store_name:
@@ -171,60 +326,51 @@ def process(playlist_id: str, store_name: str, skip_existing: bool, languages: s
         # Get or create file search store
         file_search_store = uploader.get_or_create_file_search_store(store_name)
 
-        # Load or create state
-        state = state_manager.get_or_create(playlist_id, file_search_store)
-
-        # Process each video
-        processed_count = 0
-        skipped_count = 0
-        failed_count = 0
-
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console,
-        ) as progress:
-            task = progress.add_task("Processing videos...", total=len(videos))
-
-            for i, video in enumerate(videos, 1):
-                progress.update(
-                    task,
-                    description=f"[{i}/{len(videos)}] {video.title[:50]}...",
+        # Create state for a playlist processed for the first time
+        if state is None:
+            state = state_manager.get_or_create(playlist_id, file_search_store)
+
+        # Process the remaining videos through the fetch/transform/upload pipeline
+        try:
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                console=console,
+            ) as progress:
+                task = progress.add_task(
+                    "Processing videos...", total=total, completed=counts["skipped"]
                 )
 
-                # Skip if already processed
-                if skip_existing and state.is_processed(video.video_id):
-                    console.print(f"  ⏭️  Skipping (already processed): {video.title}")
-                    skipped_count += 1
-                    progress.advance(task)
-                    continue
-
-                console.print(f"\n[bold]Processing:[/] {video.title}")
-
-                # Process the video
-                success, _status = _process_single_video(
-                    video,
-                    state_manager,
-                    state,
-                    transcript_retriever,
-                    transformer,
-                    uploader,
-                    file_search_store,
+                def on_done(video, status):
+                    counts[status] += 1
+                    progress.update(
+                        task,
+                        advance=1,
+                        description=f"[{counts.total()}/{total}] {video.title[:50]}...",
+                    )
+
+                pipeline = _VideoPipeline(
+                    state_manager=state_manager,
+                    state=state,
+                    transcript_retriever=transcript_retriever,
+                    transformer=transformer,
+                    uploader=uploader,
+                    file_search_store=file_search_store,
+                    on_done=on_done,
                 )
-
-                if success:
-                    processed_count += 1
-                else:
-                    failed_count += 1
-
-                progress.advance(task)
+                asyncio.run(pipeline.run(videos))
+        finally:
+            # Fold this run's change log into a single snapshot
+            state_manager.compact(state)
 
         # Summary
-        _print_summary(processed_count, skipped_count, failed_count, playlist_id)
+        _print_summary(counts["processed"], counts["skipped"], counts["failed"], playlist_id)
 
     except Exception as e:
         console.print(f"\n[red]Error: {e!s}[/]")
         sys.exit(1)
+    finally:
+        http_session.close()
 
 
 @main.command()
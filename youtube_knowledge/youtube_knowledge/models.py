@@ -4,7 +4,7 @@ from dataclasses import dataclass, field
 from datetime import datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class VideoInfo:
     """Information about a YouTube video."""
 
@@ -21,7 +21,7 @@ class VideoInfo:
         return cls(video_id=video_id, title=title, url=url)
 
 
-@dataclass
+@dataclass(slots=True)
 class TranscriptEntry:
     """A single transcript entry with timing."""
 
@@ -30,7 +30,7 @@ class TranscriptEntry:
     duration: float
 
 
-@dataclass
+@dataclass(slots=True)
 class ProcessedVideo:
     """Record of a processed video."""
 
@@ -41,6 +41,8 @@ class ProcessedVideo:
     transcript_length: int
     transformed_length: int
     error: str | None = None
+    # Digest of the uploaded content, to skip re-uploading it unchanged
+    content_hash: str | None = None
 
     @classmethod
     def create(
@@ -51,6 +53,7 @@ class ProcessedVideo:
         transcript_length: int = 0,
         transformed_length: int = 0,
         error: str | None = None,
+        content_hash: str | None = None,
     ) -> "ProcessedVideo":
         """Create a new ProcessedVideo record."""
         return cls(
@@ -61,10 +64,11 @@ class ProcessedVideo:
             transcript_length=transcript_length,
             transformed_length=transformed_length,
             error=error,
+            content_hash=content_hash,
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class PlaylistState:
     """State tracking for a processed playlist."""
 
@@ -77,19 +81,32 @@ class PlaylistState:
 
     def is_processed(self, video_id: str) -> bool:
         """Check if a video has been successfully processed."""
-        return video_id in self.processed_videos and not self.processed_videos[video_id].error
+        video = self.processed_videos.get(video_id)
+        return video is not None and not video.error
 
-    def add_processed(self, video: ProcessedVideo) -> None:
-        """Add a processed video to the state."""
+    def processed_ids(self) -> set[str]:
+        """Get the IDs of all successfully processed videos."""
+        return {video_id for video_id, video in self.processed_videos.items() if not video.error}
+
+    def add_processed(self, video: ProcessedVideo, now: str | None = None) -> None:
+        """Add a processed video to the state.
+
+        ``now`` is the update timestamp; pass one in to share it across a batch
+        of updates instead of reading the clock for each.
+        """
         self.processed_videos[video.video_id] = video
-        self.last_updated = datetime.utcnow().isoformat()
+        self._touch(now)
         if video.error and video.video_id in self.failed_videos:
             del self.failed_videos[video.video_id]
 
-    def add_failed(self, video_id: str, error: str) -> None:
-        """Add a failed video to the state."""
+    def add_failed(self, video_id: str, error: str, now: str | None = None) -> None:
+        """Add a failed video to the state (``now`` as for add_processed)."""
         self.failed_videos[video_id] = error
-        self.last_updated = datetime.utcnow().isoformat()
+        self._touch(now)
+
+    def _touch(self, now: str | None = None) -> None:
+        """Set last_updated to ``now``, or to the current time if not given."""
+        self.last_updated = now or datetime.utcnow().isoformat()
 
     @classmethod
     def create(cls, playlist_id: str, file_search_store_name: str) -> "PlaylistState":
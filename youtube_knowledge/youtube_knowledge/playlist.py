@@ -1,5 +1,7 @@
 """Playlist video fetching using yt-dlp."""
 
+import re
+import time
 from typing import Any
 
 import yt_dlp
@@ -7,6 +9,13 @@ import yt_dlp
 from .models import VideoInfo
 
 
+# How long a fetched playlist is reused before yt-dlp is asked again
+PLAYLIST_CACHE_TTL_SECONDS = 600
+
+# Playlist ID in a query string such as "list=PL...&index=2"
+_LIST_RE = re.compile(r"list=([^&]+)")
+
+
 class PlaylistFetcher:
     """Fetches video information from YouTube playlists."""
 
@@ -15,22 +24,60 @@ class PlaylistFetcher:
         self.ydl_opts: dict[str, Any] = {
             "quiet": True,
             "no_warnings": True,
-            "extract_flat": True,  # Don't download, just get metadata
+            # Don't download, just get metadata for the playlist's entries
+            "extract_flat": "in_playlist",
         }
+        # Playlist URL -> (fetched at, title, entries)
+        self._info_cache: dict[str, tuple[float, str | None, list[dict]]] = {}
 
-    def fetch_videos(self, playlist_id: str) -> list[VideoInfo]:
-        """Fetch all videos from a playlist.
+    def fetch_playlist(
+        self, playlist_id: str, skip_ids: set[str] | None = None
+    ) -> tuple[str | None, list[VideoInfo], int]:
+        """Fetch a playlist's title and videos with a single yt-dlp extraction.
 
         Args:
             playlist_id: YouTube playlist ID
+            skip_ids: Video IDs to leave out (e.g. already processed ones); they
+                are dropped before any VideoInfo is built
 
         Returns:
-            List of VideoInfo objects
+            Tuple of (playlist title or None, list of VideoInfo objects, number
+            of videos left out by skip_ids)
+
+        Raises:
+            Exception: If playlist cannot be fetched
+        """
+        title, entries = self._extract_info(playlist_id)
+        skip_ids = skip_ids or set()
+        try:
+            videos = [
+                VideoInfo.from_yt_dlp(entry)
+                for entry in entries
+                if entry.get("id", "") not in skip_ids
+            ]
+        except Exception as e:
+            raise Exception(f"Failed to fetch playlist {playlist_id}: {e!s}") from e
+        return title, videos, len(entries) - len(videos)
+
+    def _extract_info(self, playlist_id: str) -> tuple[str | None, list[dict]]:
+        """Extract a playlist's title and entries, reusing a recent extraction.
+
+        Results are cached per playlist for PLAYLIST_CACHE_TTL_SECONDS, so
+        repeated lookups (e.g. the title after the videos) don't extract again.
+
+        Args:
+            playlist_id: YouTube playlist ID
+
+        Returns:
+            Tuple of (playlist title or None, yt-dlp entries of available videos)
 
         Raises:
             Exception: If playlist cannot be fetched
         """
         playlist_url = self._get_playlist_url(playlist_id)
+        cached = self._info_cache.get(playlist_url)
+        if cached and time.monotonic() - cached[0] < PLAYLIST_CACHE_TTL_SECONDS:
+            return cached[1], cached[2]
 
         try:
             with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:  # type: ignore[arg-type]
@@ -39,23 +86,32 @@ class PlaylistFetcher:
                 if not info:
                     raise ValueError(f"No information found for playlist {playlist_id}")
 
-                videos = []
-                entries = info.get("entries", [])
+                # Skip None entries (deleted/private videos)
+                entries = [entry for entry in info.get("entries", []) if entry is not None]
 
-                for entry in entries:
-                    if entry:  # Skip None entries (deleted/private videos)
-                        try:
-                            video = VideoInfo.from_yt_dlp(entry)
-                            videos.append(video)
-                        except Exception as e:
-                            print(f"Warning: Failed to parse video entry: {e}")
-                            continue
-
-                return videos
+                title = info.get("title")
+                self._info_cache[playlist_url] = (time.monotonic(), title, entries)
+                return title, entries
 
         except Exception as e:
             raise Exception(f"Failed to fetch playlist {playlist_id}: {e!s}") from e
 
+    def fetch_videos(self, playlist_id: str, skip_ids: set[str] | None = None) -> list[VideoInfo]:
+        """Fetch all videos from a playlist.
+
+        Args:
+            playlist_id: YouTube playlist ID
+            skip_ids: Video IDs to leave out
+
+        Returns:
+            List of VideoInfo objects
+
+        Raises:
+            Exception: If playlist cannot be fetched
+        """
+        _title, videos, _skipped = self.fetch_playlist(playlist_id, skip_ids)
+        return videos
+
     def get_playlist_title(self, playlist_id: str) -> str | None:
         """Get the title of a playlist.
 
@@ -65,15 +121,16 @@ class PlaylistFetcher:
         Returns:
             Playlist title or None if unavailable
         """
-        playlist_url = self._get_playlist_url(playlist_id)
-
         try:
-            with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:  # type: ignore[arg-type]
-                info = ydl.extract_info(playlist_url, download=False)
-                return info.get("title") if info else None
+            title, _entries = self._extract_info(playlist_id)
+            return title
         except Exception:
             return None
 
+    def cache_clear(self):
+        """Forget every cached playlist."""
+        self._info_cache.clear()
+
     def _get_playlist_url(self, playlist_id: str) -> str:
         """Convert playlist ID to URL.
 
@@ -87,7 +144,7 @@ class PlaylistFetcher:
             return playlist_id
 
         # Clean up playlist ID if it has extra parameters
-        if "list=" in playlist_id:
-            playlist_id = playlist_id.split("list=")[1].split("&")[0]
+        if match := _LIST_RE.search(playlist_id):
+            playlist_id = match.group(1)
 
         return f"https://www.youtube.com/playlist?list={playlist_id}"
@@ -1,13 +1,38 @@
 """State management for playlist processing."""
 
-import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import ClassVar
+
+import msgspec
 
 from .models import PlaylistState, ProcessedVideo
 
 
+# msgspec encodes/decodes the state dataclasses (including the nested
+# ProcessedVideo records) directly in C
+_encoder = msgspec.json.Encoder()
+_decoder = msgspec.json.Decoder(PlaylistState)
+# Change log lines are plain JSON objects; reusing one decoder avoids per-line setup
+_log_decoder = msgspec.json.Decoder()
+
+# The change log is compacted into the state file once it holds more than
+# this many lines per processed or failed video
+COMPACT_RATIO = 2
+
+
 class StateManager:
-    """Manages persistent state for playlist processing."""
+    """Manages persistent state for playlist processing.
+
+    Each playlist has a state file (``<id>.json``) holding a full snapshot and
+    a change log (``<id>.log.jsonl``) that every processed or failed video is
+    appended to as one line. Loading replays the log over the snapshot;
+    compacting writes a new snapshot and empties the log.
+    """
+
+    # State directories already created by this process
+    _created_dirs: ClassVar[set[Path]] = set()
 
     def __init__(self, state_dir: Path = Path(".state/playlists")):
         """Initialize state manager.
@@ -16,15 +41,26 @@ class StateManager:
             state_dir: Directory to store state files
         """
         self.state_dir = state_dir
-        self.state_dir.mkdir(parents=True, exist_ok=True)
+        if state_dir not in StateManager._created_dirs:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+            StateManager._created_dirs.add(state_dir)
+        # Lines in each playlist's change log
+        self._log_lines: dict[str, int] = {}
 
     def _get_state_path(self, playlist_id: str) -> Path:
         """Get path to state file for a playlist."""
         return self.state_dir / f"{playlist_id}.json"
 
+    def _get_log_path(self, playlist_id: str) -> Path:
+        """Get path to the change log for a playlist."""
+        return self.state_dir / f"{playlist_id}.log.jsonl"
+
     def load(self, playlist_id: str) -> PlaylistState | None:
         """Load state for a playlist.
 
+        Falls back to the backup of the previous save if the state file is
+        missing or unreadable, then replays the change log on top.
+
         Args:
             playlist_id: YouTube playlist ID
 
@@ -32,78 +68,133 @@ class StateManager:
             PlaylistState if exists, None otherwise
         """
         state_path = self._get_state_path(playlist_id)
-        if not state_path.exists():
-            return None
-
-        try:
-            with state_path.open() as f:
-                data = json.load(f)
-
-            # Convert processed_videos dict to ProcessedVideo objects
-            processed_videos = {
-                video_id: ProcessedVideo(**video_data)
-                for video_id, video_data in data.get("processed_videos", {}).items()
-            }
-
-            return PlaylistState(
-                playlist_id=data["playlist_id"],
-                file_search_store_name=data["file_search_store_name"],
-                created_at=data["created_at"],
-                last_updated=data["last_updated"],
-                processed_videos=processed_videos,
-                failed_videos=data.get("failed_videos", {}),
-            )
-        except (json.JSONDecodeError, KeyError) as e:
-            print(f"Warning: Failed to load state for {playlist_id}: {e}")
-            return None
+        for path in (state_path, state_path.with_suffix(".json.bak")):
+            if not path.exists():
+                continue
+            try:
+                state = _decoder.decode(path.read_bytes())
+            except msgspec.DecodeError as e:
+                print(f"Warning: Failed to load state for {playlist_id} from {path.name}: {e}")
+                continue
+            self._replay_log(state)
+            return state
+        return None
+
+    def _replay_log(self, state: PlaylistState) -> None:
+        """Apply the changes recorded in a playlist's log to its snapshot.
+
+        Args:
+            state: PlaylistState loaded from the state file
+        """
+        log_path = self._get_log_path(state.playlist_id)
+        lines = log_path.read_bytes().splitlines() if log_path.exists() else []
+        for line in lines:
+            try:
+                record = _log_decoder.decode(line)
+                # Replayed changes keep the time they were recorded at
+                now = record["last_updated"]
+                if record["op"] == "processed":
+                    state.add_processed(msgspec.convert(record["video"], ProcessedVideo), now)
+                else:
+                    state.add_failed(record["video_id"], record["error"], now)
+            except (msgspec.DecodeError, msgspec.ValidationError, KeyError):
+                # A crash mid-append can leave a partial last line
+                print(f"Warning: Skipping unreadable change log line for {state.playlist_id}")
+        self._log_lines[state.playlist_id] = len(lines)
 
     def save(self, state: PlaylistState) -> None:
         """Save state for a playlist.
 
+        The new state is written and synced to a temporary file first, the
+        previous state is kept as a backup, and the temporary file is then
+        renamed into place, so a crash mid-save never leaves a truncated file.
+
         Args:
             state: PlaylistState to save
         """
         state_path = self._get_state_path(state.playlist_id)
+        tmp_path = state_path.with_suffix(".json.tmp")
+        with tmp_path.open("wb") as f:
+            f.write(msgspec.json.format(_encoder.encode(state), indent=2))
+            f.flush()
+            os.fsync(f.fileno())
+
+        if state_path.exists():
+            state_path.replace(state_path.with_suffix(".json.bak"))
+        tmp_path.replace(state_path)
 
-        # Convert ProcessedVideo objects to dicts
-        processed_videos = {
-            video_id: {
-                "video_id": video.video_id,
-                "title": video.title,
-                "processed_at": video.processed_at,
-                "gemini_file_name": video.gemini_file_name,
-                "transcript_length": video.transcript_length,
-                "transformed_length": video.transformed_length,
-                "error": video.error,
-            }
-            for video_id, video in state.processed_videos.items()
-        }
-
-        data = {
-            "playlist_id": state.playlist_id,
-            "file_search_store_name": state.file_search_store_name,
-            "created_at": state.created_at,
-            "last_updated": state.last_updated,
-            "processed_videos": processed_videos,
-            "failed_videos": state.failed_videos,
-        }
-
-        with state_path.open("w") as f:
-            json.dump(data, f, indent=2)
+        # The snapshot now includes every logged change
+        self._get_log_path(state.playlist_id).unlink(missing_ok=True)
+        self._log_lines[state.playlist_id] = 0
+
+    def compact(self, state: PlaylistState) -> None:
+        """Fold the change log into a fresh snapshot if it has any entries.
+
+        Args:
+            state: PlaylistState to save
+        """
+        if self._log_lines.get(state.playlist_id):
+            self.save(state)
+
+    def append(self, state: PlaylistState, record: dict) -> None:
+        """Append one change to a playlist's log.
+
+        The first change to a playlist without a state file saves a snapshot
+        instead, and the log is compacted once it grows past COMPACT_RATIO
+        lines per video.
+
+        Args:
+            state: PlaylistState the change was already applied to
+            record: Change record with an ``op`` of "processed" or "failed"
+        """
+        if not self._get_state_path(state.playlist_id).exists():
+            self.save(state)
+            return
+
+        with self._get_log_path(state.playlist_id).open("ab") as f:
+            f.write(_encoder.encode({**record, "last_updated": state.last_updated}) + b"\n")
+        self._log_lines[state.playlist_id] = self._log_lines.get(state.playlist_id, 0) + 1
+
+        live = len(state.processed_videos) + len(state.failed_videos)
+        if self._log_lines[state.playlist_id] > COMPACT_RATIO * live:
+            self.save(state)
+
+    def record_processed(self, state: PlaylistState, video: ProcessedVideo) -> None:
+        """Add a processed video to a playlist's state and log it.
+
+        Args:
+            state: PlaylistState to update
+            video: Record of the processed video
+        """
+        state.add_processed(video)
+        self.append(state, {"op": "processed", "video": video})
+
+    def record_failed(self, state: PlaylistState, video_id: str, error: str) -> None:
+        """Add a failed video to a playlist's state and log it.
+
+        Args:
+            state: PlaylistState to update
+            video_id: YouTube video ID
+            error: Why processing failed
+        """
+        state.add_failed(video_id, error)
+        self.append(state, {"op": "failed", "video_id": video_id, "error": error})
 
     def list_playlists(self) -> list[PlaylistState]:
         """List all tracked playlists.
 
+        State files are read and decoded on a thread pool, since most of the
+        time goes to file I/O.
+
         Returns:
             List of PlaylistState objects
         """
-        playlists = []
-        for state_file in self.state_dir.glob("*.json"):
-            playlist_id = state_file.stem
-            state = self.load(playlist_id)
-            if state:
-                playlists.append(state)
-        return playlists
+        playlist_ids = [state_file.stem for state_file in self.state_dir.glob("*.json")]
+        if not playlist_ids:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(16, len(playlist_ids))) as executor:
+            return [state for state in executor.map(self.load, playlist_ids) if state]
 
     def get_or_create(self, playlist_id: str, file_search_store_name: str) -> PlaylistState:
         """Get existing state or create new one.
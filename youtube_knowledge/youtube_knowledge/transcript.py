@@ -1,5 +1,11 @@
 """Transcript retrieval from YouTube videos."""
 
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import TypeVar
+
+import requests
 from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api._errors import (
     NoTranscriptFound,
@@ -10,18 +16,25 @@ from youtube_transcript_api._errors import (
 from .models import TranscriptEntry
 
 
+T = TypeVar("T")
+
+
 class TranscriptRetriever:
     """Retrieves transcripts from YouTube videos."""
 
-    def __init__(self, languages: list[str] | None = None):
+    def __init__(
+        self, languages: list[str] | None = None, http_client: requests.Session | None = None
+    ):
         """Initialize transcript retriever.
 
         Args:
             languages: Preferred languages for transcripts (e.g., ['en', 'de'])
                       Falls back to auto-generated if manual not available
+            http_client: HTTP session to fetch with, so its connections are kept
+                      alive across videos (a new session is created if omitted)
         """
         self.languages = languages or ["en"]
-        self.api = YouTubeTranscriptApi()
+        self.api = YouTubeTranscriptApi(http_client=http_client)
 
     def get_transcript(self, video_id: str) -> list[TranscriptEntry] | None:
         """Get transcript for a video.
@@ -32,22 +45,36 @@ class TranscriptRetriever:
         Returns:
             List of TranscriptEntry objects, or None if unavailable
         """
+        return self._fetch(video_id, self._to_entries)
+
+    def get_transcript_and_format(self, video_id: str) -> tuple[list[TranscriptEntry], str] | None:
+        """Get a video's transcript together with its format_transcript text.
+
+        Builds the entries and the formatted lines in one pass over the fetched
+        snippets.
+
+        Args:
+            video_id: YouTube video ID
+
+        Returns:
+            Tuple of (TranscriptEntry list, formatted transcript text), or None if unavailable
+        """
+        return self._fetch(video_id, self._to_entries_and_text)
+
+    def _fetch(self, video_id: str, convert: Callable[[Iterable], T]) -> T | None:
+        """Fetch a video's transcript in the preferred languages and convert it.
+
+        Args:
+            video_id: YouTube video ID
+            convert: Builds the result from the fetched transcript snippets
+
+        Returns:
+            The converted transcript, or None if unavailable
+        """
         try:
             # Fetch transcript in preferred languages
-            fetched = self.api.fetch(video_id, languages=self.languages)
-
-            # Convert to our model
             # FetchedTranscript is iterable and yields FetchedTranscriptSnippet dataclasses
-            transcript = [
-                TranscriptEntry(
-                    text=entry.text,
-                    start=entry.start,
-                    duration=entry.duration,
-                )
-                for entry in fetched
-            ]
-
-            return transcript
+            return convert(self.api.fetch(video_id, languages=self.languages))
 
         except TranscriptsDisabled:
             print(f"  ⚠️  Transcripts disabled for video {video_id}")
@@ -62,6 +89,46 @@ class TranscriptRetriever:
             print(f"  ❌ Error fetching transcript for {video_id}: {e!s}")
             return None
 
+    @staticmethod
+    def _to_entries(fetched: Iterable) -> list[TranscriptEntry]:
+        """Convert fetched transcript snippets to our model."""
+        return [
+            TranscriptEntry(text=entry.text, start=entry.start, duration=entry.duration)
+            for entry in fetched
+        ]
+
+    @classmethod
+    def _to_entries_and_text(cls, fetched: Iterable) -> tuple[list[TranscriptEntry], str]:
+        """Convert fetched snippets to our model and format them in the same loop."""
+        format_timestamp = cls._format_timestamp
+        transcript = []
+        lines = []
+        for entry in fetched:
+            transcript.append(
+                TranscriptEntry(text=entry.text, start=entry.start, duration=entry.duration)
+            )
+            lines.append(f"[{format_timestamp(int(entry.start))}] {entry.text}")
+        return transcript, "\n".join(lines)
+
+    def get_transcripts_bulk(
+        self, video_ids: list[str], concurrency: int = 8
+    ) -> dict[str, list[TranscriptEntry] | None]:
+        """Get transcripts for many videos concurrently.
+
+        Fetches are network-bound, so they run on a bounded thread pool. Errors
+        are handled per video exactly as in get_transcript.
+
+        Args:
+            video_ids: YouTube video IDs
+            concurrency: Maximum number of fetches in flight
+
+        Returns:
+            Mapping of video ID to its transcript, or None if unavailable
+        """
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            transcripts = executor.map(self.get_transcript, video_ids)
+            return dict(zip(video_ids, transcripts, strict=True))
+
     def format_transcript(self, transcript: list[TranscriptEntry]) -> str:
         """Format transcript entries into readable text.
 
@@ -71,12 +138,9 @@ class TranscriptRetriever:
         Returns:
             Formatted transcript text with timestamps
         """
-        lines = []
-        for entry in transcript:
-            timestamp = self._format_timestamp(entry.start)
-            lines.append(f"[{timestamp}] {entry.text}")
-
-        return "\n".join(lines)
+        return "\n".join(
+            f"[{self._format_timestamp(int(entry.start))}] {entry.text}" for entry in transcript
+        )
 
     def format_transcript_plain(self, transcript: list[TranscriptEntry]) -> str:
         """Format transcript as plain text without timestamps.
@@ -89,18 +153,21 @@ class TranscriptRetriever:
         """
         return " ".join(entry.text for entry in transcript)
 
-    def _format_timestamp(self, seconds: float) -> str:
-        """Format seconds into MM:SS or HH:MM:SS.
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _format_timestamp(seconds: int) -> str:
+        """Format whole seconds into MM:SS or HH:MM:SS.
+
+        Cached, since consecutive transcript entries often share the same second.
 
         Args:
-            seconds: Time in seconds
+            seconds: Time in whole seconds
 
         Returns:
             Formatted timestamp string
         """
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
+        hours, rem = divmod(seconds, 3600)
+        minutes, secs = divmod(rem, 60)
 
         if hours > 0:
             return f"{hours:02d}:{minutes:02d}:{secs:02d}"
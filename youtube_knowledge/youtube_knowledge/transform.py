@@ -1,11 +1,14 @@
 """Transcript transformation using Gemini for knowledge optimization."""
 
-from google import genai
+import asyncio
+from string import Template
 
+from ._client import get_client
 from .models import TranscriptEntry, VideoInfo
 
 
-TRANSFORMATION_PROMPT = """You are a knowledge curator tasked with transforming a YouTube video transcript into a well-structured document optimized for knowledge retention and semantic search.
+# Fixed guidelines, kept apart so only the short per-video tail is templated
+_PROMPT_PREAMBLE = """You are a knowledge curator tasked with transforming a YouTube video transcript into a well-structured document optimized for knowledge retention and semantic search.
 
 Transform the following transcript into a comprehensive knowledge document following these guidelines:
 
@@ -54,18 +57,34 @@ Transform the following transcript into a comprehensive knowledge document follo
 - Make it **comprehensive** - don't lose important information
 - Make it **accurate** - maintain the speaker's intended meaning
 
-## Video Information:
-- **Title**: {title}
-- **Video ID**: {video_id}
-- **URL**: {url}
+"""
+
+_PROMPT_TAIL_TEMPLATE = Template("""## Video Information:
+- **Title**: $title
+- **Video ID**: $video_id
+- **URL**: $url
 
 ## Transcript:
-{transcript}
+$transcript
 
 ---
 
 Transform this transcript into a well-structured knowledge document following the guidelines above.
-"""
+""")
+
+_METADATA_HEADER_TEMPLATE = Template("""---
+title: $title
+video_id: $video_id
+video_url: $url
+source: YouTube
+type: video_transcript
+---
+
+""")
+
+# Prompts longer than this are rejected before any API call; roughly a
+# 1M-token context window at a conservative 3 characters per token
+MAX_PROMPT_CHARS = 3_000_000
 
 
 class TranscriptTransformer:
@@ -78,7 +97,7 @@ class TranscriptTransformer:
             api_key: Google Gemini API key
             model: Gemini model to use (default: gemini-2.0-flash-exp)
         """
-        self.client = genai.Client(api_key=api_key)
+        self.client = get_client(api_key)
         self.model = model
 
     def transform(
@@ -98,33 +117,106 @@ class TranscriptTransformer:
             Transformed markdown document, or None on error
         """
         try:
-            # Build the prompt with video information and transcript
-            prompt = TRANSFORMATION_PROMPT.format(
-                title=video.title,
-                video_id=video.video_id,
-                url=video.url,
-                transcript=formatted_transcript,
-            )
-
             # Generate transformed content using Gemini
             response = self.client.models.generate_content(
                 model=self.model,
-                contents=prompt,
+                contents=self._build_prompt(video, formatted_transcript),
             )
+            return self._handle_response(video, response)
 
-            if not response or not response.text:
-                print(f"  ❌ No response from Gemini for video {video.video_id}")
-                return None
+        except Exception as e:
+            print(f"  ❌ Error transforming transcript for {video.video_id}: {e!s}")
+            return None
 
-            # Add metadata header to the document
-            transformed = self._add_metadata_header(video, response.text)
+    async def atransform(
+        self,
+        video: VideoInfo,
+        transcript: list[TranscriptEntry],
+        formatted_transcript: str,
+    ) -> str | None:
+        """Transform a transcript using the async Gemini client.
 
-            return transformed
+        Args:
+            video: VideoInfo object with video metadata
+            transcript: List of TranscriptEntry objects
+            formatted_transcript: Pre-formatted transcript text with timestamps
+
+        Returns:
+            Transformed markdown document, or None on error
+        """
+        try:
+            response = await self.client.aio.models.generate_content(
+                model=self.model,
+                contents=self._build_prompt(video, formatted_transcript),
+            )
+            return self._handle_response(video, response)
 
         except Exception as e:
             print(f"  ❌ Error transforming transcript for {video.video_id}: {e!s}")
             return None
 
+    async def transform_many(
+        self,
+        items: list[tuple[VideoInfo, list[TranscriptEntry], str]],
+        max_concurrency: int = 8,
+    ) -> list[str | None]:
+        """Transform several transcripts concurrently.
+
+        Args:
+            items: (video, transcript, formatted_transcript) tuples
+            max_concurrency: Maximum number of requests in flight at once
+
+        Returns:
+            Transformed documents (or None on error), in the same order as items
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def bounded(item: tuple[VideoInfo, list[TranscriptEntry], str]) -> str | None:
+            async with semaphore:
+                return await self.atransform(*item)
+
+        return await asyncio.gather(*(bounded(item) for item in items))
+
+    def _build_prompt(self, video: VideoInfo, formatted_transcript: str) -> str:
+        """Build the transformation prompt for a video.
+
+        Args:
+            video: VideoInfo object
+            formatted_transcript: Pre-formatted transcript text with timestamps
+
+        Returns:
+            Prompt with video information and transcript
+
+        Raises:
+            ValueError: If the prompt would not fit in the model's context window
+        """
+        prompt = _PROMPT_PREAMBLE + _PROMPT_TAIL_TEMPLATE.substitute(
+            title=video.title,
+            video_id=video.video_id,
+            url=video.url,
+            transcript=formatted_transcript,
+        )
+        if len(prompt) > MAX_PROMPT_CHARS:
+            raise ValueError(f"Prompt too long ({len(prompt)} chars)")
+        return prompt
+
+    def _handle_response(self, video: VideoInfo, response) -> str | None:
+        """Turn a Gemini response into the final document.
+
+        Args:
+            video: VideoInfo object
+            response: Gemini API response
+
+        Returns:
+            Transformed document with metadata header, or None if the response is empty
+        """
+        if not response or not response.text:
+            print(f"  ❌ No response from Gemini for video {video.video_id}")
+            return None
+
+        # Add metadata header to the document
+        return self._add_metadata_header(video, response.text)
+
     def _add_metadata_header(self, video: VideoInfo, content: str) -> str:
         """Add metadata header to transformed content.
 
@@ -135,13 +227,7 @@ class TranscriptTransformer:
         Returns:
             Content with metadata header
         """
-        header = f"""---
-title: {video.title}
-video_id: {video.video_id}
-video_url: {video.url}
-source: YouTube
-type: video_transcript
----
-
-"""
+        header = _METADATA_HEADER_TEMPLATE.substitute(
+            title=video.title, video_id=video.video_id, url=video.url
+        )
         return header + content
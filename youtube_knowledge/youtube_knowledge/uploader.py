@@ -1,22 +1,107 @@
 """File upload to Gemini File Search with idempotency."""
 
-import tempfile
+import asyncio
+import contextlib
+import hashlib
+import io
+import logging
+import random
+import sqlite3
+import threading
 import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import BinaryIO, ClassVar
 
-from google import genai
+from ._client import get_client
+
+
+# Progress is logged rather than printed; the CLI shows INFO and above, and
+# per-document cache hits and indexing waits only at DEBUG
+logger = logging.getLogger(__name__)
+
+# Indexing status polling: exponential backoff from the initial delay up to the
+# maximum, giving up after a fixed number of status checks (about 7 minutes).
+# Each wait adds up to POLL_JITTER of itself at random so concurrent uploads
+# don't poll in lockstep.
+POLL_INITIAL_DELAY = 0.25
+POLL_MAX_DELAY = 8.0
+POLL_BACKOFF = 1.6
+POLL_JITTER = 0.1
+MAX_INDEXING_POLLS = 60
+
+# How long the listing of existing files is trusted before it is listed again
+FILE_INDEX_TTL_SECONDS = 600
+
+# Bytes read at a time when hashing a file object
+_HASH_CHUNK_SIZE = 1 << 16
+
+
+def _new_digest(data: bytes = b""):
+    """Create the content hash used to recognize unchanged uploads."""
+    return hashlib.blake2b(data, digest_size=16)
+
+
+def _poll_delays():
+    """Yield the waits between indexing status checks, MAX_INDEXING_POLLS in all."""
+    delay = POLL_INITIAL_DELAY
+    for _ in range(MAX_INDEXING_POLLS):
+        yield delay + random.uniform(0, delay * POLL_JITTER)
+        delay = min(delay * POLL_BACKOFF, POLL_MAX_DELAY)
 
 
 class GeminiUploader:
     """Handles file uploads to Gemini File Search."""
 
-    def __init__(self, api_key: str):
+    # Chunking settings shared by every upload's config; the SDK only reads them
+    _CHUNKING: ClassVar[dict] = {
+        "white_space_config": {
+            "max_tokens_per_chunk": 500,
+            "max_overlap_tokens": 50,
+        }
+    }
+
+    def __init__(self, api_key: str, manifest_path: Path | None = None):
         """Initialize the Gemini uploader.
 
         Args:
             api_key: Google Gemini API key
+            manifest_path: SQLite file recording uploads across runs, so documents
+                uploaded before are found without listing the Files API
         """
-        self.client = genai.Client(api_key=api_key)
+        self.client = get_client(api_key)
+        # display_name -> resource name, listed from the Files API on first lookup
+        self._file_name_index: dict[str, str] | None = None
+        self._file_name_index_at = 0.0
+        # (store name, display_name) -> (content digest, document name) of uploads
+        # made by this instance
+        self._uploaded: dict[tuple[str, str], tuple[str, str]] = {}
+        # Store display_name -> resource name, listed on first use
+        self._store_index: dict[str, str] | None = None
+        self._manifest = self._open_manifest(manifest_path) if manifest_path else None
+        # The manifest connection is shared by the upload threads
+        self._manifest_lock = threading.Lock()
+
+    @staticmethod
+    def _open_manifest(path: Path) -> sqlite3.Connection:
+        """Open the upload manifest, creating it if needed."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        with db:
+            columns = {row[1] for row in db.execute("PRAGMA table_info(uploads)")}
+            if columns and "store_name" not in columns:
+                # Manifests from before uploads were recorded per store can't say
+                # which store a document is in; they only save lookups, so start over
+                db.execute("DROP TABLE uploads")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS uploads ("
+                "store_name TEXT NOT NULL, display_name TEXT NOT NULL, "
+                "document_name TEXT NOT NULL, content_hash TEXT NOT NULL, "
+                "uploaded_at REAL NOT NULL, PRIMARY KEY (store_name, display_name))"
+            )
+        return db
 
     def get_or_create_file_search_store(self, store_name: str) -> str:
         """Get existing file search store or create a new one.
@@ -28,34 +113,53 @@ class GeminiUploader:
             File search store resource name
         """
         try:
-            # List existing stores
-            for store in self.client.file_search_stores.list():
-                # FileSearchStore has display_name attribute directly
-                if store.display_name == store_name:
-                    print(f"  [i] Using existing file search store: {store_name}")
-                    assert store.name, "Store name must not be None"
-                    return store.name
+            store_index = self._ensure_store_index()
+            if existing := store_index.get(store_name):
+                logger.info("  [i] Using existing file search store: %s", store_name)
+                return existing
 
             # Create new store if not found
-            print(f"  ✨ Creating new file search store: {store_name}")
+            logger.info("  ✨ Creating new file search store: %s", store_name)
             store = self.client.file_search_stores.create(config={"display_name": store_name})
             assert store.name, "Created store must have a name"
+            store_index[store_name] = store.name
             return store.name
 
         except Exception as e:
             raise Exception(f"Failed to get or create file search store: {e!s}") from e
 
+    def _ensure_store_index(self) -> dict[str, str]:
+        """Get the store index, listing file search stores if not yet listed."""
+        if self._store_index is None:
+            return self._index_stores(self.client.file_search_stores.list())
+        return self._store_index
+
+    def _index_stores(self, stores: Iterable) -> dict[str, str]:
+        """Rebuild the store index from a listing, keeping the first store per display name."""
+        index: dict[str, str] = {}
+        for store in stores:
+            # FileSearchStore has display_name attribute directly
+            if store.name:
+                index.setdefault(store.display_name, store.name)
+        self._store_index = index
+        return index
+
     def upload_document(
         self,
-        content: str,
+        content: str | bytes | BinaryIO,
         display_name: str,
         store_name: str,
         check_existing: bool = True,
     ) -> str | None:
         """Upload a document to Gemini File Search.
 
+        An upload already recorded for the display name in the store is reused
+        only while its content is unchanged. Changed content is uploaded again,
+        and the new document replaces the recorded one, which is deleted.
+
         Args:
-            content: Document content (markdown)
+            content: Document content (markdown), as text, UTF-8 bytes, or a binary
+                file object that is streamed to the API without being read into memory
             display_name: Deterministic display name for the file
             store_name: File search store resource name
             check_existing: Check if file already exists before uploading
@@ -64,80 +168,371 @@ class GeminiUploader:
             Uploaded file resource name, or None on error
         """
         try:
-            # Check if file already exists
+            recorded = self._recorded_upload(display_name, store_name)
+            # A file only known from the Files API needs neither hashing nor a buffer
+            if check_existing and recorded is None and (known := self._known_file(display_name)):
+                logger.debug("  ♻️  File already uploaded: %s", display_name)
+                return known
+
+            digest, file = self._prepare_upload(content)
+
+            # The recorded upload only counts if its content is unchanged
+            if check_existing and recorded and recorded[0] == digest:
+                logger.debug("  ♻️  File already uploaded: %s", display_name)
+                return recorded[1]
+
+            # Check if file already exists; a recorded upload with other content
+            # is replaced rather than reused
+            if (
+                check_existing
+                and recorded is None
+                and (existing := self._check_existing_file(display_name))
+            ):
+                logger.debug("  ♻️  File already uploaded: %s", display_name)
+                return existing
+
+            # Upload directly to file search store from the buffer or file
+            logger.info("  📤 Uploading: %s", display_name)
+            operation = self.client.file_search_stores.upload_to_file_search_store(
+                file=file,
+                file_search_store_name=store_name,
+                config=self._upload_config(display_name),
+            )
+
+            # Wait for indexing to complete
+            logger.debug("  ⏳ Indexing: %s", display_name)
+            operation = self._wait_for_operation(operation)
+            document_name = self._record_upload(operation, display_name, store_name, digest)
+            if recorded and recorded[1] != document_name:
+                self._delete_document(recorded[1])
+            return document_name
+
+        except Exception as e:
+            logger.error("  ❌ Upload failed for %s: %s", display_name, e)
+            return None
+
+    async def aupload_document(
+        self,
+        content: str | bytes | BinaryIO,
+        display_name: str,
+        store_name: str,
+        check_existing: bool = True,
+    ) -> str | None:
+        """Upload a document using the async Gemini client.
+
+        Indexing waits are awaited rather than slept, so many uploads can be
+        pending on one event loop. Arguments are as for upload_document.
+
+        Returns:
+            Uploaded file resource name, or None on error
+        """
+        try:
+            recorded = self._recorded_upload(display_name, store_name)
+            if check_existing and recorded is None and (known := self._known_file(display_name)):
+                logger.debug("  ♻️  File already uploaded: %s", display_name)
+                return known
+
+            digest, file = self._prepare_upload(content)
+
             if check_existing:
-                existing = self._check_existing_file(display_name)
-                if existing:
-                    print(f"  ♻️  File already uploaded: {display_name}")
+                if recorded and recorded[0] == digest:
+                    logger.debug("  ♻️  File already uploaded: %s", display_name)
+                    return recorded[1]
+                # Usually answered from the index, but listing the Files API blocks
+                if recorded is None and (
+                    existing := await asyncio.to_thread(self._check_existing_file, display_name)
+                ):
+                    logger.debug("  ♻️  File already uploaded: %s", display_name)
                     return existing
 
-            # Write content to temporary file
-            with tempfile.NamedTemporaryFile(mode="w", suffix=".md", delete=False) as tmp_file:
-                tmp_file.write(content)
-                tmp_path = tmp_file.name
-
-            try:
-                # Upload directly to file search store
-                print(f"  📤 Uploading: {display_name}")
-                operation = self.client.file_search_stores.upload_to_file_search_store(
-                    file=tmp_path,
-                    file_search_store_name=store_name,
-                    config={
-                        "display_name": display_name,
-                        "mime_type": "text/markdown",
-                        "chunking_config": {
-                            "white_space_config": {
-                                "max_tokens_per_chunk": 500,
-                                "max_overlap_tokens": 50,
-                            }
-                        },
-                    },
-                )
+            logger.info("  📤 Uploading: %s", display_name)
+            operation = await self.client.aio.file_search_stores.upload_to_file_search_store(
+                file=file,
+                file_search_store_name=store_name,
+                config=self._upload_config(display_name),
+            )
+
+            logger.debug("  ⏳ Indexing: %s", display_name)
+            operation = await self._await_operation(operation)
+            document_name = self._record_upload(operation, display_name, store_name, digest)
+            if recorded and recorded[1] != document_name:
+                await self._adelete_document(recorded[1])
+            return document_name
+
+        except Exception as e:
+            logger.error("  ❌ Upload failed for %s: %s", display_name, e)
+            return None
+
+    def upload_documents(
+        self,
+        docs: list[tuple[str, str]],
+        store_name: str,
+        max_workers: int = 8,
+    ) -> list[str | None]:
+        """Upload several documents concurrently.
+
+        Uploads and their indexing waits overlap on a thread pool; the Files API
+        is listed once up front rather than by each upload.
+
+        Args:
+            docs: (content, display_name) tuples
+            store_name: File search store resource name
+            max_workers: Maximum number of uploads in flight at once
+
+        Returns:
+            Uploaded file resource names (or None on error), in the same order as docs
+        """
+        if not docs:
+            return []
+
+        # Build the existing-file index before the uploads start looking it up; a
+        # failed listing is retried by the uploads' own lookups
+        with contextlib.suppress(Exception):
+            self._ensure_file_index()
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(docs))) as executor:
+            return list(
+                executor.map(lambda doc: self.upload_document(doc[0], doc[1], store_name), docs)
+            )
+
+    async def aupload_documents(
+        self,
+        docs: list[tuple[str, str]],
+        store_name: str,
+        max_concurrency: int = 32,
+    ) -> list[str | None]:
+        """Upload several documents concurrently on the event loop.
 
-                # Wait for indexing to complete
-                print("  ⏳ Indexing...")
-                while not operation.done:
-                    time.sleep(2)
-                    operation = self.client.operations.get(operation)
+        Args:
+            docs: (content, display_name) tuples
+            store_name: File search store resource name
+            max_concurrency: Maximum number of uploads in flight at once
+
+        Returns:
+            Uploaded file resource names (or None on error), in the same order as docs
+        """
+        if not docs:
+            return []
+
+        # Build the existing-file index before the uploads start looking it up
+        with contextlib.suppress(Exception):
+            await asyncio.to_thread(self._ensure_file_index)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def bounded(doc: tuple[str, str]) -> str | None:
+            async with semaphore:
+                return await self.aupload_document(doc[0], doc[1], store_name)
+
+        return await asyncio.gather(*(bounded(doc) for doc in docs))
+
+    @staticmethod
+    def _prepare_upload(content: str | bytes | BinaryIO) -> tuple[str, BinaryIO]:
+        """Hash a document's content and get a binary file to upload it from.
+
+        Text is encoded once, and the same bytes are hashed and uploaded. A file
+        object's content starts at its current position.
+
+        Returns:
+            (content digest, file positioned at the start of the content)
+        """
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        if isinstance(content, bytes):
+            return _new_digest(content).hexdigest(), io.BytesIO(content)
+        # Read in chunks rather than with hashlib.file_digest, which hashes a
+        # BytesIO's whole buffer whatever its position
+        start = content.tell()
+        digest = _new_digest()
+        while chunk := content.read(_HASH_CHUNK_SIZE):
+            digest.update(chunk)
+        content.seek(start)
+        return digest.hexdigest(), content
+
+    @classmethod
+    def _upload_config(cls, display_name: str) -> dict:
+        """Build the upload config for a document."""
+        return {
+            "display_name": display_name,
+            "mime_type": "text/markdown",
+            "chunking_config": cls._CHUNKING,
+        }
 
-                # Extract document name from operation response
-                # The response is an UploadToFileSearchStoreResponse object
-                response = getattr(operation, "response", None)
-                if response and hasattr(response, "document_name"):
-                    document_name = response.document_name
-                    if document_name:
-                        print(f"  ✅ Successfully uploaded and indexed: {display_name}")
-                        return document_name
+    def _record_upload(self, operation, display_name: str, store_name: str, digest: str) -> str:
+        """Get the document name from a finished upload and record it in the indexes.
 
-                raise Exception("Operation completed but no document name in response")
+        Args:
+            operation: Completed upload operation
+            display_name: File display name
+            store_name: File search store resource name the document was uploaded to
+            digest: Digest of the uploaded content
+
+        Returns:
+            Document resource name
+
+        Raises:
+            Exception: If the operation has no document name
+        """
+        # The response is an UploadToFileSearchStoreResponse object
+        response = getattr(operation, "response", None)
+        document_name = getattr(response, "document_name", None)
+        if not document_name:
+            raise Exception("Operation completed but no document name in response")
+
+        logger.info("  ✅ Successfully uploaded and indexed: %s", display_name)
+        self._uploaded[store_name, display_name] = (digest, document_name)
+        if self._manifest is not None:
+            with self._manifest_lock, self._manifest:
+                self._manifest.execute(
+                    "INSERT OR REPLACE INTO uploads "
+                    "(store_name, display_name, document_name, content_hash, uploaded_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (store_name, display_name, document_name, digest, time.time()),
+                )
+        return document_name
 
-            finally:
-                # Clean up temporary file
-                Path(tmp_path).unlink(missing_ok=True)
+    def _delete_document(self, document_name: str):
+        """Delete a document replaced by a new upload of the same display name."""
+        try:
+            self.client.file_search_stores.documents.delete(
+                name=document_name, config={"force": True}
+            )
+        except Exception as e:
+            logger.warning("  ⚠️  Failed to delete replaced document %s: %s", document_name, e)
 
+    async def _adelete_document(self, document_name: str):
+        """Async counterpart of _delete_document, using the async client."""
+        try:
+            await self.client.aio.file_search_stores.documents.delete(
+                name=document_name, config={"force": True}
+            )
         except Exception as e:
-            print(f"  ❌ Upload failed for {display_name}: {e!s}")
-            return None
+            logger.warning("  ⚠️  Failed to delete replaced document %s: %s", document_name, e)
+
+    def _wait_for_operation(self, operation):
+        """Poll an operation until it is done, backing off between status checks.
+
+        Args:
+            operation: Long-running operation returned by the API
 
-    def _check_existing_file(self, display_name: str) -> str | None:
+        Returns:
+            The completed operation
+
+        Raises:
+            TimeoutError: If the operation is still running after MAX_INDEXING_POLLS checks
+        """
+        for delay in _poll_delays():
+            if operation.done:
+                return operation
+            time.sleep(delay)
+            operation = self.client.operations.get(operation)
+
+        if operation.done:
+            return operation
+        raise TimeoutError(f"Indexing not finished after {MAX_INDEXING_POLLS} status checks")
+
+    async def _await_operation(self, operation):
+        """Async counterpart of _wait_for_operation, using the async client."""
+        for delay in _poll_delays():
+            if operation.done:
+                return operation
+            await asyncio.sleep(delay)
+            operation = await self.client.aio.operations.get(operation)
+
+        if operation.done:
+            return operation
+        raise TimeoutError(f"Indexing not finished after {MAX_INDEXING_POLLS} status checks")
+
+    def _check_existing_file(self, display_name: str, store_name: str | None = None) -> str | None:
         """Check if a file with the given display name already exists.
 
+        Uploads to the given store recorded in the manifest are found without a
+        request. Otherwise the Files API is listed once and kept as an index for
+        later lookups, which is rebuilt once it is older than FILE_INDEX_TTL_SECONDS.
+
         Args:
             display_name: File display name to check
+            store_name: File search store resource name the file is meant for
 
         Returns:
             File resource name if exists, None otherwise
         """
         try:
-            # List files in the Files API
-            for file in self.client.files.list():
-                if file.display_name == display_name:
-                    return file.name
-            return None
+            if known := self._known_file(display_name, store_name):
+                return known
+            return self._ensure_file_index().get(display_name)
         except Exception:
             # If listing fails, assume file doesn't exist
             return None
 
+    def _ensure_file_index(self) -> dict[str, str]:
+        """Get the file index, listing the Files API if not yet listed or expired."""
+        if self._file_index_is_fresh():
+            assert self._file_name_index is not None
+            return self._file_name_index
+        # List files in the Files API, keeping the first file per display name
+        index: dict[str, str] = {}
+        for file in self.client.files.list():
+            index.setdefault(file.display_name, file.name)
+        self._file_name_index = index
+        self._file_name_index_at = time.monotonic()
+        return index
+
+    def _known_file(self, display_name: str, store_name: str | None = None) -> str | None:
+        """Look a display name up without listing files.
+
+        Uploads made by this instance and those recorded in the manifest only
+        count for ``store_name``; the Files API index is used if still fresh.
+        """
+        if store_name and (recorded := self._recorded_upload(display_name, store_name)):
+            return recorded[1]
+        if not self._file_index_is_fresh():
+            return None
+        assert self._file_name_index is not None
+        return self._file_name_index.get(display_name)
+
+    def _recorded_upload(self, display_name: str, store_name: str) -> tuple[str, str] | None:
+        """Get the upload recorded for a display name in a store, if any.
+
+        Returns:
+            (content digest, document name) of the recorded upload, or None
+        """
+        recorded = self._uploaded.get((store_name, display_name))
+        if recorded is None and self._manifest is not None:
+            with self._manifest_lock:
+                row = self._manifest.execute(
+                    "SELECT content_hash, document_name FROM uploads "
+                    "WHERE store_name = ? AND display_name = ?",
+                    (store_name, display_name),
+                ).fetchone()
+            recorded = (row[0], row[1]) if row else None
+        return recorded
+
+    def _file_index_is_fresh(self) -> bool:
+        """Check whether the file index has been listed and has not expired."""
+        return (
+            self._file_name_index is not None
+            and time.monotonic() - self._file_name_index_at < FILE_INDEX_TTL_SECONDS
+        )
+
+    def filter_new(self, display_names: Iterable[str]) -> set[str]:
+        """Get the display names that have no file uploaded yet.
+
+        All names are checked against one listing of the Files API.
+
+        Args:
+            display_names: File display names to check
+
+        Returns:
+            The display names without an existing file
+        """
+        return {name for name in display_names if not self._check_existing_file(name)}
+
+    def refresh_file_index(self):
+        """Forget the cached file and store indexes so the next lookups list again."""
+        self._file_name_index = None
+        self._uploaded.clear()
+        self._store_index = None
+
     def list_files(self) -> list[tuple[str, str]]:
         """List all uploaded files.
 
@@ -149,7 +544,7 @@ class GeminiUploader:
             for file in self.client.files.list():
                 files.append((file.name, file.display_name))
         except Exception as e:
-            print(f"Warning: Failed to list files: {e}")
+            logger.warning("Warning: Failed to list files: %s", e)
         return files
 
     def get_file_search_stores(self) -> list[tuple[str, str]]:
@@ -158,11 +553,11 @@ class GeminiUploader:
         Returns:
             List of (store_name, display_name) tuples
         """
-        stores = []
         try:
-            for store in self.client.file_search_stores.list():
-                # FileSearchStore has display_name attribute directly
-                stores.append((store.name, store.display_name))
+            stores = list(self.client.file_search_stores.list())
         except Exception as e:
-            print(f"Warning: Failed to list file search stores: {e}")
-        return stores
+            logger.warning("Warning: Failed to list file search stores: %s", e)
+            return []
+        # The fresh listing also serves later get_or_create_file_search_store calls
+        self._index_stores(stores)
+        return [(store.name, store.display_name) for store in stores]